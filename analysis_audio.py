@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+
+import feature_cache
+import telemetry
+
+# Every comparison decodes to this rate, mono, so recordings made at
+# different rates line up without per-call resampling.
+ANALYSIS_RATE = 16000
+# librosa res_type names: soxr_hq is fast and accurate, polyphase needs only
+# scipy, kaiser_fast needs resampy.
+RESAMPLERS = ("soxr_hq", "soxr_mq", "soxr_lq", "soxr_vhq", "polyphase", "kaiser_fast",
+              "kaiser_best", "fft")
+DEFAULT_RESAMPLER = os.environ.get("SANSKRIT_TTS_RESAMPLER", "soxr_hq")
+
+
+def load_pcm(file_path, sr=ANALYSIS_RATE, res_type=DEFAULT_RESAMPLER, fmt="mp3"):
+    """Return (samples, sample_rate) of audio as float32 mono at sr.
+
+    The decoded and resampled PCM is cached as .npy keyed by file content,
+    rate and resampler, and returned memory-mapped, so repeat calls skip
+    both the decode and the resampling. sr=None keeps the native rate.
+
+    At the native rate and with the soxr resamplers the file is decoded
+    and resampled block by block straight into the cache, so memory stays
+    bounded however long the recording; the other resamplers decode the
+    whole file with librosa.load.
+
+    file_path may also be encoded audio bytes in format fmt, as returned by
+    the synthesis backends, or a (samples, sample_rate) pair. Those are
+    decoded and resampled in memory and never touch the cache.
+    """
+    if res_type not in RESAMPLERS:
+        raise ValueError(f"Unknown resampler {res_type!r}; available: {list(RESAMPLERS)}")
+    if not isinstance(file_path, str):
+        return _memory_pcm(file_path, sr, res_type, fmt)
+
+    def decode(path, sr):
+        import streaming_features
+
+        if sr is None:
+            return _decode_blocks(path, None, "native"), streaming_features.source_rate(path)
+        if res_type.startswith("soxr"):
+            return _decode_blocks(path, sr, res_type), sr
+        import librosa
+
+        with telemetry.span("decode", resampler=res_type):
+            return librosa.load(path, sr=sr, mono=True, res_type=res_type)
+
+    name = f"pcm-{res_type}" if sr is not None else "pcm"
+    return feature_cache.cached_file_feature(file_path, name, decode, sr=sr)
+
+
+def _memory_pcm(source, sr, res_type, fmt):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        from audio_buffers import decode_bytes
+
+        samples, rate = decode_bytes(bytes(source), fmt)
+    else:
+        samples, rate = source
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            # librosa's (channels, samples) layout.
+            samples = samples.mean(axis=0)
+    if sr is not None and sr != rate:
+        import librosa
+
+        with telemetry.span("decode", resampler=res_type):
+            samples = librosa.resample(samples, orig_sr=rate, target_sr=sr, res_type=res_type)
+        rate = sr
+    return np.ascontiguousarray(samples, dtype=np.float32), rate
+
+
+def _decode_blocks(path, sr, res_type):
+    """Yield mono float32 blocks of a file, resampled to sr with a soxr stream.
+
+    The output has the length librosa.load gives, ceil(frames * sr / native).
+    """
+    import streaming_features
+
+    with telemetry.span("decode", resampler=res_type):
+        native = streaming_features.source_rate(path)
+        if sr is None or sr == native:
+            yield from streaming_features.iter_audio_blocks(path)
+            return
+        import soxr
+
+        stream = soxr.ResampleStream(native, sr, 1, dtype="float32", quality=res_type)
+        frames = 0
+        produced = 0
+        for block in streaming_features.iter_audio_blocks(path):
+            frames += len(block)
+            out = stream.resample_chunk(block)
+            produced += len(out)
+            yield out
+        expected = int(np.ceil(frames * sr / native))
+        tail = stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        tail = np.concatenate((tail, np.zeros(max(0, expected - produced - len(tail)),
+                                              dtype=np.float32)))
+        yield tail[:max(0, expected - produced)]
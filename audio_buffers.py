@@ -0,0 +1,50 @@
+import io
+
+import telemetry
+
+# numpy, pydub and pygame are imported by the functions that use them, so
+# saving bytes never pays for the audio stack.
+
+
+def decode_bytes(data, fmt="mp3"):
+    """Decode encoded audio bytes to a mono float32 array and its sample rate."""
+    import numpy as np
+    from pydub import AudioSegment
+
+    with telemetry.span("decode", resampler="native"):
+        segment = AudioSegment.from_file(io.BytesIO(data), format=fmt)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * segment.sample_width - 1))
+    if segment.channels > 1:
+        samples = samples.reshape(-1, segment.channels).mean(axis=1)
+    return samples, segment.frame_rate
+
+
+def encode_segment(segment, fmt="mp3"):
+    """Encode a pydub AudioSegment to bytes without touching the disk."""
+    with telemetry.span("encode", fmt=fmt):
+        buffer = io.BytesIO()
+        segment.export(buffer, format=fmt)
+        return buffer.getvalue()
+
+
+def play_bytes(data, fmt="mp3"):
+    """Play encoded audio bytes through the pygame mixer and wait for the end."""
+    import pygame
+
+    # Time from the call until the mixer starts playing.
+    with telemetry.span("playback_start"):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.load(io.BytesIO(data), fmt)
+        pygame.mixer.music.play()
+    while pygame.mixer.music.get_busy():
+        pygame.time.Clock().tick(10)
+
+
+def save_bytes(data, filename):
+    """Persist encoded audio bytes to filename."""
+    with telemetry.span("write"), open(filename, "wb") as f:
+        f.write(data)
+    telemetry.record_write("audio", len(data))
+    return filename
@@ -4,17 +4,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.spatial.distance import cosine
 
+import feature_cache
+
 def load_audio_features(file_path):
     """
     Load audio and extract MFCC features.
     """
-    # Load the audio file
-    y, sr = librosa.load(file_path, sr=None)
-    # Extract MFCC features
-    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-    # Compute the mean of MFCC across time
-    mfcc_mean = np.mean(mfcc, axis=1)
-    return mfcc_mean
+    # MFCCs are cached per file content, so repeat calls skip the decode
+    return feature_cache.mfcc_mean(file_path, n_mfcc=13)
 
 def calculate_similarity(feature1, feature2):
     """
@@ -35,8 +32,7 @@ def plot_spectrogram(file_path, ax, title):
     """
     Plot the spectrogram of an audio file.
     """
-    y, sr = librosa.load(file_path, sr=None)
-    S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128, fmax=8000)
+    S, sr = feature_cache.melspectrogram(file_path, n_mels=128, fmax=8000)
     S_dB = librosa.power_to_db(S, ref=np.max)
     img = librosa.display.specshow(S_dB, x_axis='time', y_axis='mel', sr=sr, fmax=8000, ax=ax)
     ax.set_title(title)
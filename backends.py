@@ -0,0 +1,371 @@
+import io
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+import wave
+import zlib
+
+import telemetry
+
+# Each backend imports its client library on first use, so picking one
+# backend never pays for the others.
+
+
+class SynthesisError(RuntimeError):
+    """Raised when a backend fails to produce audio."""
+
+
+class SynthesisBackend:
+    """Turns text into encoded audio bytes, keeping its client warm between calls."""
+
+    name = ""
+    fmt = "mp3"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Time every backend's synthesize as the "synthesize" stage.
+        if "synthesize" in cls.__dict__:
+            cls.synthesize = telemetry.timed("synthesize", backend=cls.name)(cls.synthesize)
+
+    def __init__(self, lang="", voice="", rate=""):
+        self.lang = lang
+        self.voice = voice
+        self.rate = rate
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+    def cache_fields(self):
+        """Settings that change the audio and so belong in the cache key."""
+        return {"backend": self.name, "voice": self.voice, "rate": self.rate, "lang": self.lang}
+
+    def close(self):
+        pass
+
+
+# gTTS.stream() opens a new requests.Session for every request and takes no
+# session, so reusing one means replaying its private request and response
+# handling (_prepare_requests and the "jQ1olc" payload). That copy follows
+# gTTS 2.5, the one supported release; any other version goes through the
+# public write_to_fp instead, one connection per request.
+GTTS_SESSION_VERSION = "2.5."
+
+
+def _gtts_internals_supported():
+    """Whether the installed gTTS is the release _write_over_session copies."""
+    import warnings
+
+    from gtts import gTTS
+    from gtts.version import __version__
+
+    if __version__.startswith(GTTS_SESSION_VERSION) and hasattr(gTTS, "_prepare_requests"):
+        return True
+    warnings.warn(f"gTTS {__version__} is untested with session reuse; using write_to_fp",
+                  RuntimeWarning, stacklevel=3)
+    return False
+
+
+class GTTSBackend(SynthesisBackend):
+    """Google Translate TTS over per-thread keep-alive HTTP sessions."""
+
+    name = "gtts"
+
+    def __init__(self, lang="hi", voice="", rate="", slow=False):
+        super().__init__(lang=lang, voice=voice, rate=rate)
+        self.slow = slow
+        self._reuse_session = _gtts_internals_supported()
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self):
+        # One session per thread: a session serves one request at a time, and
+        # keeps that thread's connection alive between requests.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def synthesize(self, text):
+        import requests
+        from gtts import gTTS, gTTSError
+
+        tts = gTTS(text=text, lang=self.lang, slow=self.slow)
+        audio = io.BytesIO()
+        try:
+            if self._reuse_session:
+                self._write_over_session(tts, audio)
+            else:
+                tts.write_to_fp(audio)
+        except (requests.RequestException, gTTSError) as error:
+            raise SynthesisError(str(error)) from error
+        if not audio.tell():
+            raise SynthesisError(f"gTTS returned no audio for {text[:40]!r}")
+        return audio.getvalue()
+
+    def _write_over_session(self, tts, audio):
+        """Send the requests gTTS.write_to_fp would, over this thread's session."""
+        import base64
+        import urllib.request
+
+        from gtts import gTTSError
+
+        session = self._session()
+        for prepared in tts._prepare_requests():
+            response = session.send(
+                prepared, proxies=urllib.request.getproxies(), timeout=tts.timeout
+            )
+            if not response.ok:
+                raise gTTSError(tts=tts, response=response)
+            for line in response.iter_lines(chunk_size=1024):
+                decoded = line.decode("utf-8")
+                if "jQ1olc" in decoded:
+                    match = re.search(r'jQ1olc","\[\\"(.*)\\"]', decoded)
+                    if not match:
+                        raise gTTSError(tts=tts, response=response)
+                    audio.write(base64.b64decode(match.group(1).encode("ascii")))
+
+    def close(self):
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+
+class Pyttsx3Backend(SynthesisBackend):
+    """Local system speech engine, initialized once and shared by all callers."""
+
+    name = "pyttsx3"
+
+    _engine = None
+    _engine_lock = threading.Lock()
+
+    def __init__(self, lang="", voice="", rate=150, volume=0.9):
+        super().__init__(lang=lang, voice=voice, rate=rate)
+        self.volume = volume
+
+    @classmethod
+    def engine(cls):
+        if cls._engine is None:
+            import pyttsx3
+
+            cls._engine = pyttsx3.init()
+        return cls._engine
+
+    def synthesize(self, text):
+        from pydub import AudioSegment
+
+        from audio_buffers import encode_segment
+
+        # pyttsx3 can only render to a file, so use a scratch file and
+        # normalize whatever the platform engine wrote to MP3 in memory.
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            # The engine has a single event loop, so calls are serialized.
+            with self._engine_lock:
+                engine = self.engine()
+                engine.setProperty("rate", self.rate)
+                engine.setProperty("volume", self.volume)
+                if self.voice:
+                    engine.setProperty("voice", self.voice)
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            return encode_segment(AudioSegment.from_file(path), self.fmt)
+        finally:
+            os.remove(path)
+
+
+class AzureBackend(SynthesisBackend):
+    """Azure Speech with one shared config and a pool of warm synthesizers."""
+
+    name = "azure"
+    fmt = "wav"
+
+    def __init__(self, lang="", voice="", rate="", subscription_key=None, region=None,
+                 pool_size=4):
+        super().__init__(lang=lang, voice=voice, rate=rate)
+        self.subscription_key = subscription_key or os.environ.get(
+            "AZURE_SPEECH_KEY", "Your-Azure-Subscription-Key"
+        )
+        self.region = region or os.environ.get("AZURE_SPEECH_REGION", "Your-Azure-Service-Region")
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._speech_config = None
+
+    def _config(self):
+        import azure.cognitiveservices.speech as speechsdk
+
+        if self._speech_config is None:
+            config = speechsdk.SpeechConfig(subscription=self.subscription_key, region=self.region)
+            # Plain 16-bit PCM WAV plays directly in pygame, with no re-encode step.
+            config.set_speech_synthesis_output_format(
+                speechsdk.SpeechSynthesisOutputFormat.Riff24Khz16BitMonoPcm
+            )
+            if self.voice:
+                config.speech_synthesis_voice_name = self.voice
+            if self.lang:
+                config.speech_synthesis_language = self.lang
+            self._speech_config = config
+        return self._speech_config
+
+    def _acquire(self):
+        import azure.cognitiveservices.speech as speechsdk
+
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._create_lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                # No audio config keeps the result in memory instead of a file.
+                return speechsdk.SpeechSynthesizer(speech_config=self._config(), audio_config=None)
+        return self._pool.get()
+
+    def synthesize(self, text):
+        import azure.cognitiveservices.speech as speechsdk
+
+        synthesizer = self._acquire()
+        try:
+            result = synthesizer.speak_text_async(text).get()
+        finally:
+            self._pool.put(synthesizer)
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result.audio_data
+        details = result.cancellation_details
+        message = "Speech synthesis canceled: {}".format(details.reason)
+        if details.reason == speechsdk.CancellationReason.Error:
+            message += " ({})".format(details.error_details)
+        raise SynthesisError(message)
+
+
+# Latin syllables: an onset, a vowel nucleus and an optional anusvara/visarga.
+LATIN_SYLLABLE = re.compile(
+    r"[^\W\d_aeiouāīūṛṝḷḹAEIOU]*[aeiouāīūṛṝḷḹAEIOU]+[ṃḥMH~]?|[^\W_]+", re.UNICODE
+)
+
+
+def _syllables(word):
+    if any("\u0900" <= char <= "\u097f" for char in word):
+        from syllabifier import segment
+
+        return segment(word)
+    return LATIN_SYLLABLE.findall(word) or [word]
+
+
+class OfflineBackend(SynthesisBackend):
+    """Deterministic network-free backend for load tests and CI benchmarks.
+
+    Every syllable becomes a short voiced burst whose pitch and formants are
+    derived from the syllable itself, so the same text always gives the
+    same audio. Latency and failures can be injected to mimic a remote
+    service.
+    """
+
+    name = "offline"
+    fmt = "wav"
+
+    def __init__(self, lang="", voice="", rate="", sample_rate=16000, syllable_ms=120,
+                 gap_ms=20, latency_ms=0, latency_jitter_ms=0, failure_rate=0.0, seed=0):
+        super().__init__(lang=lang, voice=voice, rate=rate)
+        self.sample_rate = sample_rate
+        self.syllable_ms = syllable_ms
+        self.gap_ms = gap_ms
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _burst(self, syllable):
+        import numpy as np
+
+        digest = zlib.crc32(syllable.encode("utf-8"))
+        pitch = 100 + digest % 150
+        formant1 = 300 + (digest >> 8) % 500
+        formant2 = 900 + (digest >> 16) % 1500
+        t = np.arange(self.sample_rate * self.syllable_ms // 1000) / self.sample_rate
+        tone = (
+            0.5 * np.sin(2 * np.pi * pitch * t)
+            + 0.3 * np.sin(2 * np.pi * formant1 * t)
+            + 0.2 * np.sin(2 * np.pi * formant2 * t)
+        )
+        return tone * np.hanning(len(t))
+
+    def render(self, text):
+        """Return the float waveform for text without encoding it."""
+        import numpy as np
+
+        gap = np.zeros(self.sample_rate * self.gap_ms // 1000)
+        pieces = []
+        for word in text.split():
+            for syllable in _syllables(word):
+                pieces.append(self._burst(syllable))
+                pieces.append(gap)
+            pieces.append(gap)
+        return np.concatenate(pieces) if pieces else gap
+
+    def synthesize(self, text):
+        with self._random_lock:
+            delay = self.latency_ms + self._random.uniform(0, self.latency_jitter_ms)
+            failed = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay / 1000)
+        if failed:
+            raise SynthesisError("Injected offline backend failure")
+
+        samples = (self.render(text) * 0.8 * 32767).astype("<i2")
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+BACKENDS = {
+    "gtts": GTTSBackend,
+    "pyttsx3": Pyttsx3Backend,
+    "azure": AzureBackend,
+    "offline": OfflineBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name, **options):
+    """Return the shared backend instance for name and options.
+
+    Setting SANSKRIT_TTS_BACKEND (e.g. to "offline") swaps the backend for
+    every caller, keeping only the options all backends understand.
+    """
+    override = os.environ.get("SANSKRIT_TTS_BACKEND")
+    if override and override != name:
+        options = {k: v for k, v in options.items() if k in ("lang", "voice", "rate")}
+        name = override
+    key = (name, tuple(sorted(options.items())))
+    with _instances_lock:
+        backend = _instances.get(key)
+        if backend is None:
+            try:
+                backend_class = BACKENDS[name]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown synthesis backend {name!r}; available: {sorted(BACKENDS)}"
+                ) from None
+            backend = _instances[key] = backend_class(**options)
+    return backend
@@ -0,0 +1,148 @@
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import telemetry
+from analysis_audio import ANALYSIS_RATE
+
+DEFAULT_METRICS = ("similarity", "alignment")
+FIELDS = [
+    "id", "synthesized", "reference", "percentage_similarity", "cosine_similarity",
+    "similarity_dtw_distance", "dtw_distance", "alignment_distance", "waveform_difference",
+    "identical", "elapsed", "error",
+]
+
+
+def read_pairs(path):
+    """Yield (id, synthesized, reference) triples from a CSV or JSONL manifest.
+
+    Each record needs "synthesized" and "reference" file paths and may give
+    an "id"; relative paths are resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for number, record in enumerate(records, start=1):
+            yield (
+                str(record.get("id") or number),
+                os.path.join(base, record["synthesized"]),
+                os.path.join(base, record["reference"]),
+            )
+
+
+def score_pair(task):
+    """Score one pair in a worker process.
+
+    Returns the result row and the worker's metrics for this pair, which the
+    parent merges, since counters recorded in a worker stay in that process.
+    """
+    import comparison
+
+    telemetry.reset()
+    (item_id, synthesized, reference), metrics, sr, band = task
+    row = {"id": item_id, "synthesized": synthesized, "reference": reference}
+    start = time.perf_counter()
+    try:
+        report = comparison.compare(synthesized, reference, metrics=metrics, band=band, sr=sr)
+    # Decoders raise a variety of types; one bad file must not stop the run.
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    else:
+        row.update({k: v for k, v in report.to_dict().items() if k in FIELDS})
+    row["elapsed"] = time.perf_counter() - start
+    return row, telemetry.snapshot()
+
+
+def write_results(rows, output):
+    """Write result rows as Parquet when output ends in .parquet, else CSV."""
+    if output.endswith(".parquet"):
+        import pandas as pd
+
+        pd.DataFrame(rows, columns=FIELDS).to_parquet(output, index=False)
+        return
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_scoring(manifest, output, metrics=DEFAULT_METRICS, sr=ANALYSIS_RATE, band=0.1,
+                workers=None, chunksize=8):
+    """Score every pair in manifest over a process pool and write the results."""
+    from comparison import ALL_METRICS
+
+    unknown = set(metrics) - set(ALL_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+    if output.endswith(".parquet") and not any(
+        importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")
+    ):
+        # Fail before scoring rather than after the whole run.
+        raise ImportError("Parquet output needs pyarrow or fastparquet installed")
+    pairs = list(read_pairs(manifest))
+    tasks = [(pair, tuple(metrics), sr, band) for pair in pairs]
+    total = len(tasks)
+    rows = []
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Tasks go to workers chunksize at a time to amortize pickling and IPC.
+        results = pool.map(score_pair, tasks, chunksize=chunksize)
+        for count, (row, metrics_snapshot) in enumerate(results, start=1):
+            telemetry.merge(metrics_snapshot)
+            rows.append(row)
+            failed += bool(row.get("error"))
+            print(f"\r[{count}/{total}] {failed} failed", end="", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    if total:
+        print(file=sys.stderr)
+    write_results(rows, output)
+
+    latencies = [row["elapsed"] for row in rows if not row.get("error")]
+    return {
+        "completed": len(latencies),
+        "failed": total - len(latencies),
+        "elapsed": elapsed,
+        "pairs_per_sec": total / elapsed if elapsed else 0.0,
+        "latency_p50": telemetry.percentile(latencies, 50),
+        "latency_p95": telemetry.percentile(latencies, 95),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score synthesized recordings against their human references."
+    )
+    parser.add_argument("manifest", help="CSV or JSONL with 'synthesized' and 'reference' paths")
+    parser.add_argument("output", help="Results file (.csv or .parquet)")
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS),
+                        help="Comma-separated comparison metrics")
+    parser.add_argument("--sr", type=int, default=ANALYSIS_RATE, help="Analysis rate")
+    parser.add_argument("--band", type=float, default=0.1, help="DTW band fraction")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--chunksize", type=int, default=8, help="Pairs sent per task")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on this port during the run")
+    args = parser.parse_args(argv)
+
+    if args.metrics_port:
+        telemetry.start_http_server(args.metrics_port)
+    report = run_scoring(
+        args.manifest, args.output, metrics=args.metrics.split(","), sr=args.sr,
+        band=args.band, workers=args.workers, chunksize=args.chunksize,
+    )
+    print(f"Completed: {report['completed']}, failed: {report['failed']}")
+    print(f"Throughput: {report['pairs_per_sec']:.2f} pairs/sec")
+    print(f"Latency p50: {report['latency_p50']:.3f} s, p95: {report['latency_p95']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sys
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import telemetry
+from audio_buffers import save_bytes
+from backends import get_backend
+from schemes import available_schemes
+from script_id import prepare_text
+from synthesis_cache import cache_key, cached_synthesis_bytes
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+
+def is_safe_id(item_id):
+    """Whether item_id can name a file inside the output directory.
+
+    Letters and digits of any script (with their combining marks), '_',
+    '.' and '-' are allowed, as long as the id starts with a letter or digit.
+    """
+    return item_id[:1].isalnum() and all(
+        char.isalnum() or char in "_.-" or unicodedata.category(char).startswith("M")
+        for char in item_id
+    )
+
+
+def read_corpus(path):
+    """Yield (id, text) pairs from a plain-text or JSONL corpus.
+
+    Raises ValueError for an id that is not a safe file name or that
+    appears twice.
+    """
+    jsonl = path.endswith(".jsonl")
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if jsonl:
+                record = json.loads(line)
+                item_id, text = str(record.get("id", number)), record["text"]
+            else:
+                item_id, text = str(number), line
+            if not is_safe_id(item_id):
+                raise ValueError(f"{path}:{number}: id {item_id!r} is not a safe file name")
+            if item_id in seen:
+                raise ValueError(f"{path}:{number}: duplicate id {item_id!r}")
+            seen.add(item_id)
+            yield item_id, text
+
+
+def read_checkpoint(path):
+    """Return the checkpointed entries keyed by item id."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave a torn last line; that item is redone.
+                continue
+            done[entry["id"]] = entry
+    return done
+
+
+def synthesize_item(item_id, text, backend, scheme, output_dir):
+    start = time.perf_counter()
+    english_text = prepare_text(text, scheme)
+    key = cache_key(english_text, scheme=scheme, **backend.cache_fields())
+    audio = cached_synthesis_bytes(key, lambda: backend.synthesize(english_text), ext=backend.fmt)
+    filename = save_bytes(audio, os.path.join(output_dir, f"{item_id}.{backend.fmt}"))
+    return {
+        "id": item_id,
+        "text": text,
+        "transliteration": english_text,
+        "file": filename,
+        "latency": time.perf_counter() - start,
+    }
+
+
+def run_batch(corpus, output_dir, scheme="iast", backend_name="gtts", lang="hi", workers=8):
+    """Synthesize every verse in corpus, skipping items already checkpointed.
+
+    Raises ValueError for an unknown scheme or a corpus with bad ids.
+    """
+    if scheme not in available_schemes():
+        raise ValueError(
+            f"Unknown transliteration scheme {scheme!r}; available: {available_schemes()}"
+        )
+    corpus_items = list(read_corpus(corpus))
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    done = read_checkpoint(checkpoint_path)
+    items = [(item_id, text) for item_id, text in corpus_items if item_id not in done]
+    backend = get_backend(backend_name, lang=lang)
+
+    total = len(items)
+    print(f"{len(done)} already done, {total} to synthesize", file=sys.stderr)
+    failures = []
+    latencies = []
+    start = time.perf_counter()
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(synthesize_item, item_id, text, backend, scheme, output_dir): item_id
+            for item_id, text in items
+        }
+        for count, future in enumerate(as_completed(futures), start=1):
+            item_id = futures[future]
+            try:
+                entry = future.result()
+            # One bad verse is recorded as a failure, not the end of the run.
+            except Exception as error:
+                failures.append({"id": item_id, "error": f"{type(error).__name__}: {error}"})
+            else:
+                checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                done[item_id] = entry
+                latencies.append(entry["latency"])
+            print(f"\r[{count}/{total}] {len(failures)} failed", end="", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    if total:
+        print(file=sys.stderr)
+
+    report = {
+        "completed": len(latencies),
+        "failed": len(failures),
+        "elapsed": elapsed,
+        "verses_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_p50": telemetry.percentile(latencies, 50),
+        "latency_p95": telemetry.percentile(latencies, 95),
+    }
+    manifest = {
+        "corpus": corpus,
+        "scheme": scheme,
+        "backend": backend.cache_fields(),
+        "items": [done[item_id] for item_id, _ in corpus_items if item_id in done],
+        "failures": failures,
+        "report": report,
+        "metrics": telemetry.snapshot(),
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Transliterate and synthesize a corpus of Sanskrit verses."
+    )
+    parser.add_argument("corpus", help="UTF-8 text file (one verse per line) or JSONL with 'text'")
+    parser.add_argument("output_dir", help="Directory for audio, checkpoint and manifest")
+    parser.add_argument("--scheme", default="iast", help="Transliteration scheme")
+    parser.add_argument("--backend", default="gtts", help="Synthesis backend")
+    parser.add_argument("--lang", default="hi", help="Backend language code")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent synthesis calls")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on this port during the run")
+    args = parser.parse_args(argv)
+
+    if args.metrics_port:
+        telemetry.start_http_server(args.metrics_port)
+    try:
+        report = run_batch(
+            args.corpus, args.output_dir, scheme=args.scheme, backend_name=args.backend,
+            lang=args.lang, workers=args.workers,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Completed: {report['completed']}, failed: {report['failed']}")
+    print(f"Throughput: {report['verses_per_sec']:.2f} verses/sec")
+    print(f"Latency p50: {report['latency_p50']:.3f} s, p95: {report['latency_p95']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
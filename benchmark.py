@@ -0,0 +1,291 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Fixed inputs, so results from different commits measure the same work.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(ROOT, "bench_corpus")
+# Short mantras, one Gita shloka, and the Isha Upanishad (the 40th adhyaya of
+# the Shukla Yajurveda), one verse per line.
+CORPORA = ("mantras", "shloka", "adhyaya")
+AUDIO_FIXTURES = ["demo_indic_shrisha_san747_1.wav", "output_audio/*.mp3"]
+DTW_LENGTHS = (100, 250, 500, 1000, 2000)
+# Full DTW and librosa's DTW grow quadratically; skip them above this length.
+FULL_DTW_MAX_LENGTH = 1000
+RESULTS_FORMAT = 1
+
+
+def read_corpus(name):
+    with open(os.path.join(CORPUS_DIR, f"{name}.txt"), "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def audio_fixtures():
+    files = []
+    for pattern in AUDIO_FIXTURES:
+        files.extend(sorted(glob.glob(os.path.join(ROOT, pattern))))
+    return files
+
+
+def measure(function, repeat):
+    """Time function after one warm-up call; returns timings in ms and peak memory.
+
+    The peak comes from a separate traced call, so tracing does not slow
+    the timed ones.
+    """
+    function()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_transliterate(repeat):
+    from schemes import BUILTIN_SCHEMES, transliterate
+
+    for corpus in CORPORA:
+        verses = read_corpus(corpus)
+        chars = sum(len(verse) for verse in verses)
+        for scheme in BUILTIN_SCHEMES:
+            result = measure(lambda: [transliterate(verse, scheme) for verse in verses], repeat)
+            yield dict(result, suite="transliterate", case=f"{scheme}/{corpus}", chars=chars,
+                       chars_per_sec=chars / result["median_ms"] * 1000)
+    # The whole adhyaya in one call goes through the vectorized path.
+    passage = " ".join(read_corpus("adhyaya"))
+    for scheme in BUILTIN_SCHEMES:
+        result = measure(lambda: transliterate(passage, scheme), repeat)
+        yield dict(result, suite="transliterate", case=f"{scheme}/adhyaya-passage",
+                   chars=len(passage), chars_per_sec=len(passage) / result["median_ms"] * 1000)
+
+
+def bench_synthesis(repeat):
+    from backends import OfflineBackend
+    from schemes import transliterate
+    from telemetry import percentile
+
+    backend = OfflineBackend()
+    for corpus in CORPORA:
+        verses = [transliterate(verse, "iast") for verse in read_corpus(corpus)]
+        latencies = []
+
+        def synthesize_all():
+            for verse in verses:
+                start = time.perf_counter()
+                backend.synthesize(verse)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        result = measure(synthesize_all, repeat)
+        # Keep only the timed runs, not the warm-up and traced ones.
+        latencies = latencies[len(verses):-len(verses)]
+        audio_seconds = sum(len(backend.render(verse)) for verse in verses) / backend.sample_rate
+        yield dict(result, suite="synthesis", case=f"offline/{corpus}", verses=len(verses),
+                   verse_p50_ms=percentile(latencies, 50), verse_p95_ms=percentile(latencies, 95),
+                   audio_seconds=audio_seconds,
+                   realtime_factor=audio_seconds * 1000 / result["median_ms"])
+
+
+def bench_decode(repeat):
+    import librosa
+
+    from analysis_audio import ANALYSIS_RATE, DEFAULT_RESAMPLER, load_pcm
+
+    for path in audio_fixtures():
+        name = os.path.basename(path)
+        duration = librosa.get_duration(path=path)
+        cases = {
+            "native": lambda: librosa.load(path, sr=None),
+            "analysis-rate": lambda: librosa.load(path, sr=ANALYSIS_RATE,
+                                                  res_type=DEFAULT_RESAMPLER),
+            # Served memory-mapped from the PCM cache after the warm-up call.
+            "cached": lambda: load_pcm(path)[0].sum(),
+        }
+        for label, function in cases.items():
+            result = measure(function, repeat)
+            yield dict(result, suite="decode", case=f"{label}/{name}", audio_seconds=duration,
+                       realtime_factor=duration * 1000 / result["median_ms"])
+
+
+def bench_mfcc(repeat):
+    import librosa
+
+    import streaming_features
+    from analysis_audio import ANALYSIS_RATE, load_pcm
+
+    for path in audio_fixtures():
+        name = os.path.basename(path)
+        audio = load_pcm(path)[0]
+        duration = len(audio) / ANALYSIS_RATE
+        cases = {
+            "librosa": lambda: librosa.feature.mfcc(y=audio, sr=ANALYSIS_RATE, n_mfcc=13),
+            "streaming": lambda: streaming_features.mfcc(audio, sr=ANALYSIS_RATE, n_mfcc=13),
+        }
+        for label, function in cases.items():
+            result = measure(function, repeat)
+            yield dict(result, suite="mfcc", case=f"{label}/{name}", audio_seconds=duration,
+                       realtime_factor=duration * 1000 / result["median_ms"])
+
+
+def bench_dtw(repeat):
+    import numpy as np
+    from librosa.sequence import dtw
+
+    import dtw_engine
+
+    rng = np.random.default_rng(0)
+    for n in DTW_LENGTHS:
+        # Frame counts as for two takes of one verse, 13 coefficients each.
+        x = rng.standard_normal((n, 13))
+        y = rng.standard_normal((n + n // 10, 13))
+        window = dtw_engine.band_radius(len(x), len(y), 0.1)
+        cases = {"banded": lambda: dtw_engine.dtw_distance(x, y, window=window)}
+        if n <= FULL_DTW_MAX_LENGTH:
+            cases["full"] = lambda: dtw_engine.dtw_distance(x, y)
+            cases["librosa"] = lambda: dtw(x.T, y.T, backtrack=False)
+        for label, function in cases.items():
+            result = measure(function, repeat)
+            yield dict(result, suite="dtw", case=f"{label}/{n}", frames=(len(x), len(y)))
+
+
+SUITES = {
+    "transliterate": bench_transliterate,
+    "synthesis": bench_synthesis,
+    "decode": bench_decode,
+    "mfcc": bench_mfcc,
+    "dtw": bench_dtw,
+}
+
+
+def environment():
+    """What the numbers depend on: commit, interpreter and library versions."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    versions = {}
+    for module in ("numpy", "scipy", "librosa", "soundfile", "numba"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def run_benchmarks(suites=tuple(SUITES), repeat=5):
+    """Run the named suites and return the results document."""
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise ValueError(f"Unknown suites: {sorted(unknown)}; available: {list(SUITES)}")
+    results = []
+    for suite in suites:
+        for result in SUITES[suite](repeat):
+            print(f"{result['suite']:<14} {result['case']:<48} {result['median_ms']:10.2f} ms",
+                  file=sys.stderr)
+            results.append(result)
+    import resource
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": repeat,
+        "environment": environment(),
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, tolerance=0.1):
+    """Print median ratios against a baseline; returns the cases slower than tolerance."""
+    before = {(r["suite"], r["case"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'suite':<14} {'case':<48} {'before':>10} {'after':>10} {'ratio':>7}",
+          file=sys.stderr)
+    for result in current["results"]:
+        key = (result["suite"], result["case"])
+        if key not in before:
+            continue
+        ratio = result["median_ms"] / before[key]["median_ms"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  slower"
+            regressions.append(key)
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{key[0]:<14} {key[1]:<48} {before[key]['median_ms']:10.2f} "
+              f"{result['median_ms']:10.2f} {ratio:7.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark transliteration, synthesis, decoding, MFCC and DTW."
+    )
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"Comma-separated subset of {list(SUITES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--output", help="Write the results as JSON here (default stdout)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 when a case regressed")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="Use the normal cache directory instead of a fresh one")
+    args = parser.parse_args(argv)
+
+    cache_dir = None
+    if not args.keep_cache:
+        # Set before any repo module reads settings, so runs start equally cold.
+        cache_dir = os.environ["SANSKRIT_TTS_CACHE"] = tempfile.mkdtemp(
+            prefix="sanskrit_tts_bench_"
+        )
+    try:
+        report = run_benchmarks(args.suites.split(","), repeat=args.repeat)
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, tolerance=args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_buffers import encode_segment
+from synthesis_cache import cache_key, default_cache
+
+DEFAULT_WORKERS = 4
+DEFAULT_PAUSE_MS = 400
+
+# Single and double danda, plus the '|' that ITRANS writes for them.
+VERSE_BREAK = re.compile(r"\s*[।॥|]+\s*")
+
+
+def split_verses(text):
+    """Split a passage into verse-sized chunks on danda and double danda."""
+    return [chunk for chunk in VERSE_BREAK.split(text) if chunk.strip()]
+
+
+def iter_synthesized_chunks(chunks, synthesize, fmt="mp3", max_workers=DEFAULT_WORKERS,
+                            cache=None, **key_fields):
+    """Yield audio bytes for each chunk in order, synthesizing misses concurrently.
+
+    synthesize(chunk) must return the encoded audio bytes for one chunk.
+    Repeated chunks are synthesized once and every result is cached.
+    """
+    cache = cache or default_cache()
+    keys = [cache_key(chunk, **key_fields) for chunk in chunks]
+    ready = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for chunk, key in zip(chunks, keys):
+            if key in ready or key in futures:
+                continue
+            data = cache.get_bytes(key)
+            if data is None:
+                futures[key] = pool.submit(synthesize, chunk)
+            else:
+                ready[key] = data
+        for key in keys:
+            if key not in ready:
+                ready[key] = futures[key].result()
+                cache.put(key, ready[key], fmt)
+            yield ready[key]
+
+
+def stitch(pieces, fmt="mp3", pause_ms=DEFAULT_PAUSE_MS):
+    """Concatenate encoded audio pieces with a pause between verses."""
+    # Only multi-verse passages need decoding, so pydub is imported here.
+    from pydub import AudioSegment
+
+    pause = AudioSegment.silent(duration=pause_ms)
+    combined = AudioSegment.empty()
+    for i, data in enumerate(pieces):
+        if i:
+            combined += pause
+        combined += AudioSegment.from_file(io.BytesIO(data), format=fmt)
+    return combined
+
+
+def synthesize_passage_bytes(text, synthesize, fmt="mp3", pause_ms=DEFAULT_PAUSE_MS,
+                             max_workers=DEFAULT_WORKERS, cache=None, **key_fields):
+    """Synthesize a passage verse by verse and return the stitched audio bytes."""
+    chunks = split_verses(text) or [text]
+    pieces = list(iter_synthesized_chunks(
+        chunks, synthesize, fmt=fmt, max_workers=max_workers, cache=cache, **key_fields
+    ))
+    if len(pieces) == 1:
+        # Nothing to stitch, so skip the decode and re-encode.
+        return pieces[0]
+    return encode_segment(stitch(pieces, fmt=fmt, pause_ms=pause_ms), fmt=fmt)
+
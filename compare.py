@@ -1,8 +1,12 @@
 import librosa
 import numpy as np
 import matplotlib.pyplot as plt
-from fastdtw import fastdtw
-from scipy.spatial.distance import euclidean
+
+import dtw_engine
+import pairwise
+
+# Longest axis of the DTW distance image; longer recordings are pooled.
+MAX_PLOT_FRAMES = 1000
 
 
 def extract_mfcc(audio_file):
@@ -60,8 +64,8 @@ def dtw_distance(mfcc1, mfcc2):
     if mfcc2.ndim == 1:
         mfcc2 = mfcc2.reshape(-1, 1)
 
-    # Compute the DTW distance
-    distance, path = fastdtw(mfcc1.T, mfcc2.T, dist=euclidean)
+    # Compute the exact DTW distance and alignment path over MFCC frames
+    distance, path = dtw_engine.dtw_distance(mfcc1.T, mfcc2.T, return_path=True)
     return distance, path
 
 
@@ -76,17 +80,17 @@ def calculate_similarity_percentage(dtw_distance, max_dtw_distance):
 def plot_dtw(mfcc1, mfcc2, path):
     plt.figure(figsize=(10, 8))
 
-    # Create a distance matrix
-    distance_matrix = np.zeros((mfcc1.shape[1], mfcc2.shape[1]))
-    for i in range(mfcc1.shape[1]):
-        for j in range(mfcc2.shape[1]):
-            distance_matrix[i, j] = euclidean(mfcc1[:, i], mfcc2[:, j])
+    # Create a distance matrix, pooling frames so long recordings stay small
+    frames1, factor1 = pairwise.downsample_frames(mfcc1.T, MAX_PLOT_FRAMES)
+    frames2, factor2 = pairwise.downsample_frames(mfcc2.T, MAX_PLOT_FRAMES)
+    distance_matrix = pairwise.pairwise_distances(frames1, frames2, dtype=np.float32)
 
     # Plot the distance matrix
     plt.imshow(distance_matrix, cmap="Blues", aspect="auto")
 
-    # Extract x and y coordinates for the DTW path
-    x_coords, y_coords = zip(*path)
+    # Extract x and y coordinates for the DTW path, on the pooled grid
+    path = np.asarray(path)
+    x_coords, y_coords = path[:, 0] / factor1, path[:, 1] / factor2
 
     # Overlay the DTW path
     plt.plot(y_coords, x_coords, color="red")
@@ -1,9 +1,18 @@
 import hashlib
-import librosa
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
 import numpy as np
-from librosa.sequence import dtw
-from scipy.spatial.distance import cosine
-from sklearn.preprocessing import normalize
+
+import dtw_engine
+import feature_cache
+import streaming_features
+import telemetry
+from analysis_audio import ANALYSIS_RATE, DEFAULT_RESAMPLER, load_pcm
+
+# librosa, scipy and sklearn are imported inside the metrics that use them, so
+# hash and alignment scores on cached features never load them.
 
 
 def compute_hash(file_path):
@@ -15,6 +24,26 @@ def compute_hash(file_path):
     return hash_md5.hexdigest()
 
 
+def _source_hash(source):
+    """compute_hash of a file, or the MD5 of in-memory bytes or samples."""
+    if isinstance(source, str):
+        return compute_hash(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.md5(source).hexdigest()
+    samples, rate = source
+    hash_md5 = hashlib.md5(np.ascontiguousarray(samples, dtype=np.float32).tobytes())
+    hash_md5.update(str(rate).encode("ascii"))
+    return hash_md5.hexdigest()
+
+
+def _describe(source):
+    if isinstance(source, str):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes>"
+    return "<samples>"
+
+
 def compare_hashes(file1, file2):
     """Compare file hashes to check for identical files."""
     hash1 = compute_hash(file1)
@@ -26,30 +55,35 @@ def compare_hashes(file1, file2):
     return identical
 
 
-def compare_waveforms(file1, file2):
+def compare_waveforms(file1, file2, sr=ANALYSIS_RATE):
     """Compare the raw waveforms of two audio files."""
-    audio1, sr1 = librosa.load(file1, sr=None)
-    audio2, sr2 = librosa.load(file2, sr=None)
-
-    if sr1 != sr2:
-        raise ValueError("Sampling rates of the files do not match!")
-
-    min_length = min(len(audio1), len(audio2))
-    audio1, audio2 = audio1[:min_length], audio2[:min_length]
-
-    diff = np.sum(np.abs(audio1 - audio2))
+    if sr is None:
+        if streaming_features.source_rate(file1) != streaming_features.source_rate(file2):
+            raise ValueError("Sampling rates of the files do not match!")
+        source1, source2 = file1, file2
+    else:
+        source1, source2 = load_pcm(file1, sr=sr)[0], load_pcm(file2, sr=sr)[0]
+
+    # Read both block by block so long recordings stay out of memory
+    diff = streaming_features.waveform_difference(source1, source2)
     print(f"Waveform Difference: {diff:.2f}")
     return diff
 
 
-def compare_audio_similarity(file1, file2):
+def compare_audio_similarity(file1, file2, sr=ANALYSIS_RATE):
     """Compare audio similarity using MFCC features and DTW."""
-    audio1, sr1 = librosa.load(file1, sr=None)
-    audio2, sr2 = librosa.load(file2, sr=None)
+    import librosa
+    from librosa.sequence import dtw
+    from scipy.spatial.distance import cosine
+    from sklearn.preprocessing import normalize
 
-    # Ensure sampling rates match
+    # Decoded at the analysis rate once per file content
+    audio1, sr1 = load_pcm(file1, sr=sr)
+    audio2, sr2 = load_pcm(file2, sr=sr)
+
+    # Ensure sampling rates match (only native-rate decodes can differ)
     if sr1 != sr2:
-        audio2 = librosa.resample(audio2, orig_sr=sr2, target_sr=sr1)
+        audio2 = librosa.resample(audio2, orig_sr=sr2, target_sr=sr1, res_type=DEFAULT_RESAMPLER)
         sr2 = sr1
 
     audio1 = audio1 / np.max(np.abs(audio1))
@@ -94,19 +128,18 @@ def compare_audio_similarity(file1, file2):
     )
 
 
-def compare_audio_dtw(file1, file2):
+def compare_audio_dtw(file1, file2, sr=ANALYSIS_RATE):
     """Compare the similarity of two audio files using Dynamic Time Warping (DTW)."""
-    audio1, sr1 = librosa.load(file1, sr=None)
-    audio2, sr2 = librosa.load(file2, sr=None)
+    from librosa.sequence import dtw
+
+    # Extract MFCC features for DTW comparison (cached per file content)
+    mfcc1, sr1 = feature_cache.mfcc(file1, sr=sr, n_mfcc=13)
+    mfcc2, sr2 = feature_cache.mfcc(file2, sr=sr, n_mfcc=13)
 
     # Ensure sampling rates match
     if sr1 != sr2:
         raise ValueError("Sampling rates of the files do not match!")
 
-    # Extract MFCC features for DTW comparison
-    mfcc1 = librosa.feature.mfcc(y=audio1, sr=sr1, n_mfcc=13)
-    mfcc2 = librosa.feature.mfcc(y=audio2, sr=sr2, n_mfcc=13)
-
     # Pad the MFCC matrices to have the same length (same number of frames)
     len_mfcc1 = mfcc1.shape[1]
     len_mfcc2 = mfcc2.shape[1]
@@ -124,33 +157,180 @@ def compare_audio_dtw(file1, file2):
     return D[-1, -1]
 
 
+# Sakoe-Chiba band width for frame alignment, as a fraction of the longer clip.
+DEFAULT_BAND = 0.1
+
+
+def compare_audio_alignment(file1, file2, band=DEFAULT_BAND, threshold=None, sr=ANALYSIS_RATE):
+    """Frame-by-frame DTW cost between the MFCC sequences of two files.
+
+    Unlike compare_audio_dtw, frames are aligned inside a Sakoe-Chiba band
+    and without zero padding, so a recitation scores in milliseconds. With
+    a threshold the alignment stops early and returns inf once it cannot
+    come in under it.
+    """
+    mfcc1, sr1 = feature_cache.mfcc(file1, sr=sr, n_mfcc=13)
+    mfcc2, sr2 = feature_cache.mfcc(file2, sr=sr, n_mfcc=13)
+    if sr1 != sr2:
+        raise ValueError("Sampling rates of the files do not match!")
+    return _alignment_distance(mfcc1, mfcc2, band, threshold)
+
+
+def _alignment_distance(mfcc1, mfcc2, band, threshold):
+    frames1, frames2 = np.asarray(mfcc1).T, np.asarray(mfcc2).T
+    window = dtw_engine.band_radius(len(frames1), len(frames2), band) if band else None
+    return dtw_engine.dtw_distance(frames1, frames2, window=window, threshold=threshold)
+
+
+ALL_METRICS = ("hash", "waveform", "similarity", "dtw", "alignment")
+
+
+@dataclass
+class ComparisonReport:
+    """Every requested metric for one pair of files."""
+
+    file1: str
+    file2: str
+    metrics: list
+    sample_rate1: Optional[int] = None
+    sample_rate2: Optional[int] = None
+    hash1: Optional[str] = None
+    hash2: Optional[str] = None
+    identical: Optional[bool] = None
+    waveform_difference: Optional[float] = None
+    percentage_similarity: Optional[float] = None
+    cosine_similarity: Optional[float] = None
+    similarity_dtw_distance: Optional[float] = None
+    dtw_distance: Optional[float] = None
+    alignment_distance: Optional[float] = None
+    similarity_path: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def to_dict(self):
+        report = asdict(self)
+        report.pop("similarity_path")
+        return report
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def _pad_frames(mfcc1, mfcc2):
+    max_frames = max(mfcc1.shape[1], mfcc2.shape[1])
+    mfcc1 = np.pad(mfcc1, ((0, 0), (0, max_frames - mfcc1.shape[1])), mode="constant")
+    mfcc2 = np.pad(mfcc2, ((0, 0), (0, max_frames - mfcc2.shape[1])), mode="constant")
+    return mfcc1, mfcc2
+
+
+def _source_mfcc(source, audio, rate, sr):
+    if isinstance(source, str):
+        return np.asarray(feature_cache.mfcc(source, sr=sr, n_mfcc=13)[0])
+    return streaming_features.mfcc(audio, sr=rate, n_mfcc=13)[0]
+
+
+def compare(file1, file2, metrics=ALL_METRICS, keep_path=False, band=DEFAULT_BAND,
+            threshold=None, sr=ANALYSIS_RATE, fmt="mp3"):
+    """Compute the requested metrics for two files from a single decode of each.
+
+    The values match compare_hashes, compare_waveforms,
+    compare_audio_similarity and compare_audio_dtw for the same sr. band
+    and threshold are passed on to the alignment metric as in
+    compare_audio_alignment. Both files go through the cached analysis
+    front-end at sr; sr=None keeps their native rates, which must then
+    match for the waveform, dtw and alignment metrics.
+
+    Either side may also be encoded audio bytes in format fmt, such as a
+    backend's synthesize() result, or a (samples, sample_rate) pair; those
+    are analysed in memory without writing anything to disk.
+    """
+    unknown = set(metrics) - set(ALL_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+    report = ComparisonReport(file1=_describe(file1), file2=_describe(file2),
+                              metrics=list(metrics))
+
+    if "hash" in metrics:
+        report.hash1 = _source_hash(file1)
+        report.hash2 = _source_hash(file2)
+        report.identical = report.hash1 == report.hash2
+
+    if not {"waveform", "similarity", "dtw", "alignment"} & set(metrics):
+        return report
+
+    audio1, sr1 = load_pcm(file1, sr=sr, fmt=fmt)
+    audio2, sr2 = load_pcm(file2, sr=sr, fmt=fmt)
+    report.sample_rate1, report.sample_rate2 = sr1, sr2
+    if sr1 != sr2 and {"waveform", "dtw", "alignment"} & set(metrics):
+        raise ValueError("Sampling rates of the files do not match!")
+
+    if "waveform" in metrics:
+        report.waveform_difference = streaming_features.waveform_difference(audio1, audio2)
+
+    if {"dtw", "alignment"} & set(metrics):
+        raw_mfcc1 = _source_mfcc(file1, audio1, sr1, sr)
+        raw_mfcc2 = _source_mfcc(file2, audio2, sr2, sr)
+
+    if "alignment" in metrics:
+        report.alignment_distance = _alignment_distance(raw_mfcc1, raw_mfcc2, band, threshold)
+
+    if {"dtw", "similarity"} & set(metrics):
+        from librosa.sequence import dtw
+
+    if "dtw" in metrics:
+        mfcc1, mfcc2 = _pad_frames(raw_mfcc1, raw_mfcc2)
+        # Only the total cost is reported, so skip the path backtrack.
+        with telemetry.span("dtw", engine="librosa"):
+            D = dtw(mfcc1.T, mfcc2.T, backtrack=False)
+        report.dtw_distance = float(D[-1, -1])
+
+    if "similarity" in metrics:
+        import librosa
+        from scipy.spatial.distance import cosine
+        from sklearn.preprocessing import normalize
+
+        if sr1 != sr2:
+            audio2 = librosa.resample(
+                audio2, orig_sr=sr2, target_sr=sr1, res_type=DEFAULT_RESAMPLER
+            )
+        peak1 = audio1 / np.max(np.abs(audio1))
+        peak2 = audio2 / np.max(np.abs(audio2))
+        with telemetry.span("mfcc"):
+            mfcc1, mfcc2 = _pad_frames(
+                normalize(librosa.feature.mfcc(y=peak1, sr=sr1, n_mfcc=13), axis=1),
+                normalize(librosa.feature.mfcc(y=peak2, sr=sr1, n_mfcc=13), axis=1),
+            )
+        cosine_similarity = 1 - cosine(mfcc1.mean(axis=1), mfcc2.mean(axis=1))
+        report.cosine_similarity = float(cosine_similarity)
+        report.percentage_similarity = float(max(0, cosine_similarity * 100))
+        with telemetry.span("dtw", engine="librosa"):
+            if keep_path:
+                D, report.similarity_path = dtw(mfcc1.T, mfcc2.T)
+            else:
+                D = dtw(mfcc1.T, mfcc2.T, backtrack=False)
+        report.similarity_dtw_distance = float(D[-1, -1])
+
+    return report
+
+
 if __name__ == "__main__":
     file1 = "output_audio/देवदीप.mp3"
     file2 = "output_audio/अभय.mp3"
 
-    (
-        percentage_similarity,
-        cosine_similarity,
-        dtw_distance,
-        wp,
-        mfcc1,
-        mfcc2,
-        audio1,
-        audio2,
-        sr1,
-    ) = compare_audio_similarity(file1, file2)
+    report = compare(file1, file2)
 
     print("\n--- Hash Comparison ---")
-    compare_hashes(file1, file2)
+    print(f"File 1 Hash: {report.hash1}")
+    print(f"File 2 Hash: {report.hash2}")
+    print(f"Files are identical : {report.identical}")
 
     print("\n--- Waveform Comparison ---")
-    compare_waveforms(file1, file2)
+    print(f"Waveform Difference: {report.waveform_difference:.2f}")
 
     print("\n--- Audio Feature Similarity ---")
-    print(f"{percentage_similarity:.2f}%")
+    print(f"{report.percentage_similarity:.2f}%")
 
     print("\n--- Cosine Similarity ---")
-    print(f"{cosine_similarity:.2f}")
+    print(f"{report.cosine_similarity:.2f}")
 
     print("\n--- DTW Comparison ---")
-    compare_audio_dtw(file1, file2)
+    print(f"DTW Distance: {report.dtw_distance:.2f}")
+    print(f"Banded Alignment Distance: {report.alignment_distance:.2f}")
@@ -2,11 +2,12 @@ import hashlib
 import librosa
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.preprocessing import normalize
 from scipy.spatial.distance import cosine
 from librosa.sequence import dtw
 
+from analysis_audio import ANALYSIS_RATE, DEFAULT_RESAMPLER, load_pcm
+
 
 def compute_hash(file_path):
     """Compute the MD5 hash of a file."""
@@ -17,14 +18,15 @@ def compute_hash(file_path):
     return hash_md5.hexdigest()
 
 
-def compare_audio_similarity(file1, file2):
+def compare_audio_similarity(file1, file2, sr=ANALYSIS_RATE):
     """Compare audio similarity using MFCC features and DTW."""
-    audio1, sr1 = librosa.load(file1, sr=None)
-    audio2, sr2 = librosa.load(file2, sr=None)
+    # Both files come from the cached analysis front-end at the same rate
+    audio1, sr1 = load_pcm(file1, sr=sr)
+    audio2, sr2 = load_pcm(file2, sr=sr)
 
-    # Ensure sampling rates match
+    # Ensure sampling rates match (only native-rate decodes can differ)
     if sr1 != sr2:
-        audio2 = librosa.resample(audio2, orig_sr=sr2, target_sr=sr1)
+        audio2 = librosa.resample(audio2, orig_sr=sr2, target_sr=sr1, res_type=DEFAULT_RESAMPLER)
         sr2 = sr1
         
     audio1 = audio1 / np.max(np.abs(audio1))
@@ -56,10 +58,6 @@ def compare_audio_similarity(file1, file2):
     # DTW Alignment
     dtw_distance, wp = dtw(mfcc1.T, mfcc2.T)
 
-    # Visualization
-    plot_mfcc_comparison(mfcc1, mfcc2, file1, file2)
-    plot_dtw_alignment(mfcc1, mfcc2, wp)
-
     return (
         percentage_similarity,
         cosine_similarity,
@@ -73,7 +71,16 @@ def compare_audio_similarity(file1, file2):
     )
 
 
-def plot_waveforms(audio1, audio2, sr, file1, file2):
+def show_or_save(output=None):
+    """Show the current figure, or write it to output and close it."""
+    if output is None:
+        plt.show()
+    else:
+        plt.savefig(output)
+        plt.close()
+
+
+def plot_waveforms(audio1, audio2, sr, file1, file2, output=None):
     """Plot waveforms of two audio files for comparison."""
     plt.figure(figsize=(12, 6))
     time1 = np.linspace(0, len(audio1) / sr, len(audio1))
@@ -86,29 +93,34 @@ def plot_waveforms(audio1, audio2, sr, file1, file2):
     plt.ylabel("Amplitude")
     plt.legend()
     plt.grid()
-    plt.show()
+    show_or_save(output)
+
+
+def plot_mfcc_heatmap(mfcc, title):
+    """Draw an MFCC matrix as a single rasterized image on the current axes."""
+    image = plt.imshow(
+        mfcc, aspect="auto", cmap="coolwarm", origin="lower", interpolation="nearest"
+    )
+    plt.colorbar(image)
+    plt.title(title)
+    plt.xlabel("Time Frames")
+    plt.ylabel("MFCC Coefficients")
 
 
-def plot_mfcc_comparison(mfcc1, mfcc2, file1, file2):
+def plot_mfcc_comparison(mfcc1, mfcc2, file1, file2, output=None):
     """Visualize MFCC features as heatmaps."""
     plt.figure(figsize=(14, 6))
     plt.subplot(1, 2, 1)
-    sns.heatmap(mfcc1, cmap="coolwarm", cbar=True)
-    plt.title("MFCC Heatmap: Human pronunciation")
-    plt.xlabel("Time Frames")
-    plt.ylabel("MFCC Coefficients")
+    plot_mfcc_heatmap(mfcc1, "MFCC Heatmap: Human pronunciation")
 
     plt.subplot(1, 2, 2)
-    sns.heatmap(mfcc2, cmap="coolwarm", cbar=True)
-    plt.title("MFCC Heatmap: Generated pronunciation")
-    plt.xlabel("Time Frames")
-    plt.ylabel("MFCC Coefficients")
+    plot_mfcc_heatmap(mfcc2, "MFCC Heatmap: Generated pronunciation")
 
     plt.tight_layout()
-    plt.show()
+    show_or_save(output)
 
 
-def plot_dtw_alignment(mfcc1, mfcc2, wp):
+def plot_dtw_alignment(mfcc1, mfcc2, wp, output=None):
     """Visualize the DTW alignment."""
     plt.figure(figsize=(12, 6))
     plt.imshow(
@@ -130,10 +142,10 @@ def plot_dtw_alignment(mfcc1, mfcc2, wp):
     plt.ylabel("MFCC Coefficients")
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    show_or_save(output)
 
 
-def plot_similarity_bar(similarity):
+def plot_similarity_bar(similarity, output=None):
     """Visualize the similarity score as a bar with the percentage displayed."""
     plt.figure(figsize=(6, 4))
     bars = plt.bar(["Similarity"], [similarity], color="skyblue")
@@ -155,24 +167,27 @@ def plot_similarity_bar(similarity):
             color="black",
         )
 
-    plt.show()
+    show_or_save(output)
 
 
-# Paths to audio files
-file1 = "output_audio/demo_indic_shrisha_san747_1.mp3"
-file2 = "output_audio/sanskrit_output.mp3"
+if __name__ == "__main__":
+    # Paths to audio files
+    file1 = "output_audio/demo_indic_shrisha_san747_1.mp3"
+    file2 = "output_audio/sanskrit_output.mp3"
 
-# Run similarity comparison
-similarity, cosine_similarity, dtw_distance, wp, mfcc1, mfcc2, audio1, audio2, sr = (
-    compare_audio_similarity(file1, file2)
-)
+    # Run similarity comparison
+    similarity, cosine_similarity, dtw_distance, wp, mfcc1, mfcc2, audio1, audio2, sr = (
+        compare_audio_similarity(file1, file2)
+    )
 
-# Plot the results
-print(f"Cosine Similarity: {cosine_similarity:.2f}")
-print(f"Similarity: {similarity:.2f}%")
+    # Visualize the results
+    plot_mfcc_comparison(mfcc1, mfcc2, file1, file2)
+    plot_dtw_alignment(mfcc1, mfcc2, wp)
+    print(f"Cosine Similarity: {cosine_similarity:.2f}")
+    print(f"Similarity: {similarity:.2f}%")
 
-dtw_distance_value = dtw_distance[-1, -1]
-print(f"DTW Distance: {dtw_distance_value:.2f}")
+    dtw_distance_value = dtw_distance[-1, -1]
+    print(f"DTW Distance: {dtw_distance_value:.2f}")
 
-plot_similarity_bar(similarity)
-plot_waveforms(audio1, audio2, sr, file1, file2)
+    plot_similarity_bar(similarity)
+    plot_waveforms(audio1, audio2, sr, file1, file2)
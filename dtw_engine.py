@@ -0,0 +1,175 @@
+import numba
+import numpy as np
+
+import telemetry
+
+# Backtracking codes for the optional warping path.
+DIAGONAL = 0
+UP = 1
+LEFT = 2
+
+
+def _as_frames(sequence):
+    sequence = np.asarray(sequence, dtype=np.float64)
+    if sequence.ndim == 1:
+        sequence = sequence.reshape(-1, 1)
+    return sequence
+
+
+def band_radius(n, m, fraction):
+    """Sakoe-Chiba radius covering fraction of the longer sequence."""
+    return max(1, int(np.ceil(fraction * max(n, m))))
+
+
+def band_bounds(n, m, window=None, itakura_slope=None):
+    """Return per-row inclusive column bounds (lo, hi) of the allowed region.
+
+    window is a Sakoe-Chiba radius in frames around the (scaled) diagonal;
+    itakura_slope > 1 adds an Itakura parallelogram with that maximum slope.
+    """
+    rows = np.arange(n)
+    lo = np.zeros(n, dtype=np.int64)
+    hi = np.full(n, m - 1, dtype=np.int64)
+    scale = (m - 1) / (n - 1) if n > 1 else 0.0
+    if window is not None:
+        centre = rows * scale
+        lo = np.maximum(lo, np.floor(centre - window).astype(np.int64))
+        hi = np.minimum(hi, np.ceil(centre + window).astype(np.int64))
+    if itakura_slope is not None:
+        u = rows / (n - 1) if n > 1 else np.zeros(n)
+        v_hi = np.minimum(itakura_slope * u, 1 - (1 - u) / itakura_slope)
+        v_lo = np.maximum(u / itakura_slope, 1 - itakura_slope * (1 - u))
+        # Allow one extra cell either side so short sequences stay connected.
+        lo = np.maximum(lo, np.floor(v_lo * (m - 1)).astype(np.int64) - 1)
+        hi = np.minimum(hi, np.ceil(v_hi * (m - 1)).astype(np.int64) + 1)
+    lo = np.clip(lo, 0, m - 1)
+    hi = np.clip(hi, 0, m - 1)
+    # Keep the bounds monotone and overlapping so a path always exists.
+    lo = np.minimum.accumulate(lo[::-1])[::-1]
+    hi = np.maximum.accumulate(hi)
+    hi[:-1] = np.maximum(hi[:-1], lo[1:] - 1)
+    lo = np.minimum(lo, hi)
+    lo[0], hi[-1] = 0, m - 1
+    return lo, hi
+
+
+@numba.njit(cache=True, nogil=True)
+def _banded_dtw(x, y, lo, hi, threshold, directions, offsets):
+    """Accumulated cost at (n-1, m-1), one row of the band at a time.
+
+    Rows are stored relative to lo[i], so the work and memory follow the
+    band rather than the full n x m grid. directions (empty when no path
+    is wanted) holds a code per band cell, row i starting at offsets[i].
+    """
+    n, features = x.shape
+    width = 0
+    for i in range(n):
+        width = max(width, hi[i] - lo[i] + 1)
+    previous = np.full(width, np.inf)
+    current = np.full(width, np.inf)
+    previous_lo, previous_hi = 0, -1
+    keep_path = directions.size > 0
+    for i in range(n):
+        row_lo, row_hi = lo[i], hi[i]
+        row_min = np.inf
+        for j in range(row_lo, row_hi + 1):
+            cost = 0.0
+            for f in range(features):
+                difference = x[i, f] - y[j, f]
+                cost += difference * difference
+            cost = np.sqrt(cost)
+            if i == 0 and j == 0:
+                best, choice = 0.0, DIAGONAL
+            else:
+                # Ties go to the diagonal, then up, then left.
+                best, choice = np.inf, DIAGONAL
+                if previous_lo <= j - 1 <= previous_hi:
+                    best = previous[j - 1 - previous_lo]
+                if previous_lo <= j <= previous_hi and previous[j - previous_lo] < best:
+                    best, choice = previous[j - previous_lo], UP
+                if j > row_lo and current[j - 1 - row_lo] < best:
+                    best, choice = current[j - 1 - row_lo], LEFT
+            total = cost + best
+            current[j - row_lo] = total
+            row_min = min(row_min, total)
+            if keep_path:
+                directions[offsets[i] + j - row_lo] = choice
+        # Every path crosses every row, so once a whole row is over the
+        # threshold no completion can come in under it.
+        if row_min > threshold:
+            return np.inf
+        previous, current = current, previous
+        previous_lo, previous_hi = row_lo, row_hi
+    return previous[previous_hi - previous_lo]
+
+
+@telemetry.timed("dtw", engine="dtw_engine")
+def dtw_distance(x, y, window=None, itakura_slope=None, threshold=None, return_path=False):
+    """DTW cost between two frame sequences with Euclidean frame distance.
+
+    x and y are (frames, features) arrays. Only the cells inside the band
+    are computed, row by row in a compiled loop, so a Sakoe-Chiba window
+    of radius r costs O(n * r). If threshold is given and every path must
+    already cost more, the computation stops and returns inf.
+
+    Returns the distance, or (distance, path) when return_path is True.
+    """
+    x = np.ascontiguousarray(_as_frames(x))
+    y = np.ascontiguousarray(_as_frames(y))
+    n, m = len(x), len(y)
+    lo, hi = band_bounds(n, m, window=window, itakura_slope=itakura_slope)
+    widths = hi - lo + 1
+    offsets = np.zeros(n, dtype=np.int64)
+    np.cumsum(widths[:-1], out=offsets[1:])
+    size = int(widths.sum()) if return_path else 0
+    directions = np.empty(size, dtype=np.int8)
+    distance = float(_banded_dtw(x, y, lo, hi, np.inf if threshold is None else threshold,
+                                 directions, offsets))
+    if not return_path:
+        return distance
+    if np.isinf(distance):
+        return distance, None
+    return distance, _backtrack(directions, offsets, lo, n - 1, m - 1)
+
+
+def _backtrack(directions, offsets, lo, i, j):
+    path = [(i, j)]
+    while i > 0 or j > 0:
+        step = directions[offsets[i] + j - lo[i]]
+        if step == DIAGONAL:
+            i, j = i - 1, j - 1
+        elif step == UP:
+            i -= 1
+        else:
+            j -= 1
+        path.append((i, j))
+    return np.array(path[::-1])
+
+
+def envelope(sequence, lo, hi):
+    """Upper and lower envelopes of sequence over the column ranges lo[i]..hi[i]."""
+    sequence = _as_frames(sequence)
+    width = int((hi - lo).max()) + 1
+    padded = np.pad(sequence, ((0, width - 1), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, width, axis=0)[lo]
+    # Columns past hi[i] are only padding for the fixed-width view.
+    outside = (np.arange(width) > (hi - lo)[:, None])[:, None, :]
+    upper = np.where(outside, -np.inf, windows).max(axis=-1)
+    lower = np.where(outside, np.inf, windows).min(axis=-1)
+    return upper, lower
+
+
+def lb_keogh(query, candidate, window=None, itakura_slope=None):
+    """LB_Keogh lower bound on dtw_distance(query, candidate) with the same band.
+
+    Each query frame must be matched to some candidate frame inside its row
+    of the band, so its distance to that row's envelope can never exceed
+    its share of the DTW cost.
+    """
+    query = _as_frames(query)
+    lo, hi = band_bounds(len(query), len(candidate), window=window, itakura_slope=itakura_slope)
+    upper, lower = envelope(candidate, lo, hi)
+    above = np.maximum(query - upper, 0)
+    below = np.maximum(lower - query, 0)
+    return float(np.sqrt(((above + below) ** 2).sum(axis=1)).sum())
+
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import threading
+import warnings
+
+import numpy as np
+
+import telemetry
+from index_journal import IndexJournal
+from settings import cache_path
+
+FEATURE_DIR = os.path.dirname(cache_path("features", "index.json"))
+INDEX_FILE = os.path.join(FEATURE_DIR, "index.json")
+
+_lock = threading.Lock()
+_index = None
+_journal = None
+# Cleared when the cache directory cannot be written; features are then
+# computed on every call and digests remembered only for this process.
+_enabled = True
+
+
+def _load_index():
+    global _journal
+    if _index is None:
+        _journal = IndexJournal(INDEX_FILE)
+        try:
+            _rebuild(*_journal.load())
+        except OSError as exc:
+            _disable(exc)
+    return _index
+
+
+def _disable(exc):
+    global _enabled
+    if _enabled:
+        warnings.warn(f"feature cache disabled, {FEATURE_DIR} is not writable: {exc}",
+                      RuntimeWarning, stacklevel=2)
+    _enabled = False
+    if _index is None:
+        _rebuild({}, [])
+
+
+def _rebuild(snapshot, records):
+    global _index
+    _index = {"files": dict(snapshot.get("files", {})),
+              "sample_rates": dict(snapshot.get("sample_rates", {}))}
+    _replay(records)
+    return _index
+
+
+def _replay(records):
+    for record in records:
+        _index[record["section"]][record["key"]] = record["value"]
+
+
+def _sync():
+    """Pick up entries other processes recorded; call with _lock held."""
+    if not _enabled:
+        return
+    try:
+        records = _journal.read_new()
+    except OSError as exc:
+        _disable(exc)
+        return
+    if records is None:
+        _rebuild(*_journal.load())
+    else:
+        _replay(records)
+
+
+def _lookup(section, key):
+    """An index entry, looking for other processes' entries before giving up."""
+    with _lock:
+        value = _load_index()[section].get(key)
+        if value is None:
+            _sync()
+            value = _index[section].get(key)
+    return value
+
+
+def _update_index(section, key, value):
+    """Set one index entry; call with _lock held.
+
+    The change is appended to the journal, so a write costs the same however
+    many files have been indexed, and workers never overwrite each other.
+    """
+    _load_index()[section][key] = value
+    if not _enabled:
+        return
+    try:
+        if _journal.append([{"section": section, "key": key, "value": value}]):
+            _journal.compact(_rebuild)
+    except OSError as exc:
+        _disable(exc)
+
+
+def file_digest(file_path):
+    """Return the SHA-256 of a file, rehashing only when its size or mtime change."""
+    stat = os.stat(file_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    path = os.path.abspath(file_path)
+    entry = _lookup("files", path)
+    if entry and entry[:2] == signature:
+        return entry[2]
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    with _lock:
+        _update_index("files", path, signature + [digest])
+    return digest
+
+
+def _feature_file(digest, name):
+    return os.path.join(FEATURE_DIR, digest[:2], f"{digest}-{name}.npy")
+
+
+def _save_array(path, array):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+    if isinstance(array, np.ndarray):
+        np.save(tmp_path, array)
+    else:
+        _save_blocks(tmp_path, array)
+    telemetry.record_write("features", os.path.getsize(tmp_path))
+    os.replace(tmp_path, path)
+
+
+def _save_blocks(path, blocks):
+    """Write 1-D float32 blocks as one .npy without holding them all in memory.
+
+    The length is only known at the end, so the samples go to a raw file
+    first and are copied in behind the header.
+    """
+    import shutil
+
+    raw_path = f"{path}.raw"
+    length = 0
+    try:
+        with open(raw_path, "wb") as raw:
+            for block in blocks:
+                block = np.ascontiguousarray(block, dtype=np.float32)
+                raw.write(block.tobytes())
+                length += len(block)
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                  "fortran_order": False, "shape": (length,)}
+        with open(path, "wb") as f, open(raw_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(f, header)
+            shutil.copyfileobj(raw, f, 1 << 20)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+
+def cached_feature(file_path, name, compute, sr=None):
+    """Return (feature, sample_rate), computing compute(y, sr) only on a miss.
+
+    Cached arrays are memory-mapped read-only. name must describe every
+    parameter that changes the result.
+    """
+
+    import analysis_audio
+
+    def compute_from_file(path, sr):
+        y, rate = analysis_audio.load_pcm(path, sr=sr)
+        return compute(y, rate), rate
+
+    return cached_file_feature(file_path, _resampled_name(name, sr), compute_from_file, sr=sr)
+
+
+def _resampled_name(name, sr):
+    import analysis_audio
+
+    return name if sr is None else f"{name}-{analysis_audio.DEFAULT_RESAMPLER}"
+
+
+def cached_file_feature(file_path, name, compute, sr=None):
+    """Like cached_feature, but compute(file_path, sr) decodes the file itself.
+
+    compute returns (feature, sample_rate), which lets streaming extractors
+    read the file in blocks instead of loading it whole. feature may also be
+    an iterator of 1-D float32 blocks, written to the cache as they come.
+    """
+    with telemetry.span("cache_lookup", cache="features"):
+        digest = file_digest(file_path)
+        path = _feature_file(digest, f"{name}-sr{sr or 'native'}")
+        rate_key = f"{digest}:{sr}"
+        rate = _lookup("sample_rates", rate_key)
+        hit = rate is not None and os.path.exists(path)
+        telemetry.record_cache("features", hit)
+        if hit:
+            return np.load(path, mmap_mode="r"), rate
+
+    feature, rate = compute(file_path, sr)
+    if _enabled:
+        try:
+            _save_array(path, feature)
+        except OSError as exc:
+            with _lock:
+                _disable(exc)
+            if not isinstance(feature, np.ndarray):
+                # The failed write may have used up some of the blocks.
+                feature, rate = compute(file_path, sr)
+        else:
+            with _lock:
+                _update_index("sample_rates", rate_key, rate)
+            return np.load(path, mmap_mode="r"), rate
+    if not isinstance(feature, np.ndarray):
+        feature = np.concatenate([np.asarray(block, dtype=np.float32) for block in feature] or
+                                 [np.zeros(0, np.float32)])
+    return feature, rate
+
+
+def mfcc(file_path, sr=None, n_mfcc=13, hop_length=512):
+    """MFCC matrix of a file and its sample rate."""
+    import analysis_audio
+    import streaming_features
+
+    def compute(path, sr):
+        # Either the file at its native rate or the cached memory-mapped PCM
+        # is read in blocks, keeping memory bounded for long recordings with
+        # the soxr resamplers (see load_pcm); the result equals
+        # librosa.feature.mfcc on the full decode.
+        source = path if sr is None else analysis_audio.load_pcm(path, sr=sr)[0]
+        return streaming_features.mfcc(source, sr=sr, n_mfcc=n_mfcc, hop_length=hop_length)
+
+    name = _resampled_name(f"mfcc-n{n_mfcc}-hop{hop_length}", sr)
+    return cached_file_feature(file_path, name, compute, sr=sr)
+
+
+def melspectrogram(file_path, sr=None, n_mels=128, fmax=8000, hop_length=512):
+    """Mel power spectrogram of a file and its sample rate."""
+    import librosa
+
+    return cached_feature(
+        file_path,
+        f"mel-n{n_mels}-fmax{fmax}-hop{hop_length}",
+        lambda y, rate: librosa.feature.melspectrogram(
+            y=y, sr=rate, n_mels=n_mels, fmax=fmax, hop_length=hop_length
+        ),
+        sr=sr,
+    )
+
+
+def mfcc_mean(file_path, sr=None, n_mfcc=13, hop_length=512):
+    """Time-averaged MFCC vector of a file."""
+    features, _ = mfcc(file_path, sr=sr, n_mfcc=n_mfcc, hop_length=hop_length)
+    return np.asarray(features).mean(axis=1)
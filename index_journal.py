@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+
+from settings import file_lock
+
+# An index is a JSON snapshot plus an append-only journal of the changes made
+# since it was written. Recording a change appends one line, so it costs the
+# same however large the index grows; compaction folds the journal back into
+# the snapshot. Appends hold a shared lock and compaction an exclusive one, so
+# any number of processes can record changes to the same index.
+
+# Journal size past which a writer folds it into the snapshot.
+COMPACT_BYTES = 1 << 20
+
+
+class IndexJournal:
+    """The snapshot at path and its journal at path + ".journal"."""
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self._inode = None
+        self._offset = 0
+
+    def _read_snapshot(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_journal(self):
+        """Complete records appended since the last read."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                self._inode = os.fstat(f.fileno()).st_ino
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        # A line still being appended by another process is read next time.
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Left by a writer that crashed mid-line.
+                continue
+        return records
+
+    def _compacted_elsewhere(self):
+        try:
+            inode = os.stat(self.journal_path).st_ino
+        except FileNotFoundError:
+            return False
+        return inode != self._inode
+
+    def load(self):
+        """Return the snapshot and every journaled record since it was written."""
+        with file_lock(self.path, shared=True):
+            self._inode = None
+            self._offset = 0
+            try:
+                # Creating the journal now gives an inode to tell a later
+                # compaction by another process from the first append.
+                os.close(os.open(self.journal_path, os.O_WRONLY | os.O_CREAT, 0o644))
+            except OSError:
+                pass
+            return self._read_snapshot(), self._read_journal()
+
+    def read_new(self):
+        """Records appended since the last read, or None when another process
+        compacted the journal and the index has to be loaded again."""
+        with file_lock(self.path, shared=True):
+            if self._compacted_elsewhere():
+                return None
+            return self._read_journal()
+
+    def pending(self):
+        """Whether the journal holds records not yet in the snapshot."""
+        try:
+            return os.path.getsize(self.journal_path) > 0
+        except OSError:
+            return False
+
+    def append(self, records):
+        """Append records; returns True once the journal is due for compaction."""
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with file_lock(self.path, shared=True):
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # One write per call, so lines from different processes never interleave.
+                os.write(fd, data.encode("utf-8"))
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        return size > COMPACT_BYTES
+
+    def compact(self, fold):
+        """Rewrite the snapshot as fold(snapshot, records) and empty the journal."""
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        with file_lock(self.path):
+            self._inode = None
+            self._offset = 0
+            snapshot = fold(self._read_snapshot(), self._read_journal())
+            with open(f"{self.path}.{suffix}", "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, sort_keys=True)
+            os.replace(f"{self.path}.{suffix}", self.path)
+            open(f"{self.journal_path}.{suffix}", "wb").close()
+            os.replace(f"{self.journal_path}.{suffix}", self.journal_path)
+            self._inode = os.stat(self.journal_path).st_ino
+        return snapshot
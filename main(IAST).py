@@ -1,48 +1,29 @@
-import pygame
-from gtts import gTTS
-import time
+import sys
+import telemetry
+from script_id import prepare_text
+from audio_buffers import play_bytes, save_bytes
+from backends import get_backend
+from chunked_synthesis import synthesize_passage_bytes
 
-
-start_time = time.time()
-
-sanskrit_to_english = {
-    "a": "अ", "ā": "आ", "i": "इ", "ī": "ई", "u": "उ", "ū": "ऊ", "ṛ": "ऋ", "ṝ": "ॠ",
-    "ḷ": "ऌ", "ḹ": "ॡ", "e": "ए", "ai": "ऐ", "o": "ओ", "au": "औ", "ĕ": "ऎ", "ŏ": "ऒ", "æ": "ऍ", "ǣ": "एॕ", "ô": "ऑ",
-    "aṃ": "अं", "aḥ": "अः", "am̐": "अँ",
-    "ka": "क", "kha": "ख", "ga": "ग", "gha": "घ", "ṅa": "ङ", "ca": "च", "cha": "छ",
-    "ja": "ज", "jha": "झ", "ña": "ञ", "ṭa": "ट", "ṭha": "ठ", "ḍa": "ड", "ḍha": "ढ",
-    "ṇa": "ण", "ta": "त", "tha": "थ", "da": "द", "dha": "ध", "na": "न", "pa": "प",
-    "pha": "फ", "ba": "ब", "bha": "भ", "ma": "म", "ya": "य", "ra": "र", "la": "ल",
-    "va": "व", "śa": "श", "ṣa": "ष", "sa": "स", "ha": "ह"
-    
-}
+backend = get_backend("gtts", lang="hi")
 
 def sanskrit_to_english_transliteration(sanskrit_text):
-    english_text = ''
-    for char in sanskrit_text:
-        english_text += sanskrit_to_english.get(char, char)
-    return english_text
-
-def convert_to_speech(text, filename='output.mp3'):
-    res = gTTS(text=text, lang='hi', slow=False)
-    res.save(filename)
+    return prepare_text(sanskrit_text, "iast")
 
-def play_audio(filename):
-    pygame.init()
-    pygame.mixer.init()
-    pygame.mixer.music.load(filename)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(10)
+def convert_to_speech(text):
+    return synthesize_passage_bytes(
+        text, backend.synthesize, fmt=backend.fmt, scheme="iast", **backend.cache_fields()
+    )
 
 sanskrit_text = input("Enter Sanskrit text: ")
+run = telemetry.span("run", script="iast")
 english_text = sanskrit_to_english_transliteration(sanskrit_text)
 print("Transliteration:", english_text)
 
-convert_to_speech(text=english_text, filename="sanskrit_output.mp3")
-mid_time = time.time()
-print("mp3 coversion:",mid_time-start_time)
+audio = convert_to_speech(text=english_text)
+if "--save" in sys.argv:
+    save_bytes(audio, f"sanskrit_output.{backend.fmt}")
 print("Playing audio...")
-play_audio("sanskrit_output.mp3")
-end_time = time.time()
-print("End time:",end_time-start_time)
+play_bytes(audio, backend.fmt)
+run.end()
+print(telemetry.stage_summary())
@@ -1,30 +1,38 @@
-import pygame
-from gtts import gTTS
-import time
-import json
 import os
+import sys
+import telemetry
+from schemes import register_json_scheme
+from audio_buffers import encode_segment, play_bytes, save_bytes
+from backends import get_backend
+from chunked_synthesis import stitch, synthesize_passage_bytes
+from script_id import prepare_text
+from streaming_playback import stream_passage
 
-with open("HINDI_TO_ENGLISH.json", "r", encoding="utf-8") as file:
-    HINDI_TO_ENGLISH = json.load(file)
+HINDI_TO_ENGLISH_TRANSLITERATOR = register_json_scheme(
+    "hindi_to_english", "HINDI_TO_ENGLISH.json"
+)
+
+backend = get_backend("gtts", lang="hi")
 
 output_dir = "output_audio"
 os.makedirs(output_dir, exist_ok=True)
 
 
 def transliterate_sanskrit(sanskrit_text):
-    return "".join(HINDI_TO_ENGLISH.get(char, char) for char in sanskrit_text)
-
-
-def convert_to_speech(text, filename="output.mp3"):
-    gTTS(text=text, lang="hi", slow=False).save(filename)
+    return prepare_text(sanskrit_text, "hindi_to_english")
 
 
-def play_audio(filename):
-    pygame.mixer.init()
-    pygame.mixer.music.load(filename)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(10)
+def convert_to_speech(text, filename=None):
+    audio = synthesize_passage_bytes(
+        text,
+        backend.synthesize,
+        fmt=backend.fmt,
+        scheme="hindi_to_english",
+        **backend.cache_fields(),
+    )
+    if filename:
+        save_bytes(audio, filename)
+    return audio
 
 
 def shorten_file_name(file_name, max_length=20, suffix="..."):
@@ -40,22 +48,34 @@ def shorten_file_name(file_name, max_length=20, suffix="..."):
 
 
 def main():
-    start_time = time.time()
     sanskrit_text = input("Enter Sanskrit text: ")
+    run = telemetry.span("run", script="hindi_to_english")
     english_text = transliterate_sanskrit(sanskrit_text)
     print("Transliteration:", english_text)
 
-    original_filename = f"{sanskrit_text}.mp3"
-    mp3_filename = os.path.join(
+    original_filename = f"{sanskrit_text}.{backend.fmt}"
+    audio_filename = os.path.join(
         output_dir, shorten_file_name(original_filename, max_length=50)
     )
 
-    convert_to_speech(text=english_text, filename=mp3_filename)
-    print(f"MP3 conversion time: {time.time() - start_time:.2f} seconds")
-
-    print("Playing audio...")
-    play_audio(mp3_filename)
-    print(f"Total time: {time.time() - start_time:.2f} seconds")
+    if "--stream" in sys.argv:
+        print("Streaming audio...")
+        pieces = stream_passage(
+            english_text,
+            backend.synthesize,
+            fmt=backend.fmt,
+            scheme="hindi_to_english",
+            **backend.cache_fields(),
+            on_first_audio=lambda: print("Playing audio..."),
+        )
+        save_bytes(encode_segment(stitch(pieces, fmt=backend.fmt), backend.fmt), audio_filename)
+    else:
+        audio = convert_to_speech(text=english_text, filename=audio_filename)
+        print("Playing audio...")
+        play_bytes(audio, backend.fmt)
+    run.end()
+    # playback_start is the time to first audio when streaming.
+    print(telemetry.stage_summary())
 
 
 if __name__ == "__main__":
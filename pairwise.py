@@ -0,0 +1,58 @@
+import numpy as np
+
+# Rows of the first input processed per block, bounding the temporary
+# (rows, len(b)) matrices for long recordings.
+DEFAULT_CHUNK_ROWS = 4096
+
+
+def pairwise_distances(a, b, metric="euclidean", dtype=np.float64, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Distance between every row of a and every row of b.
+
+    a and b are (frames, features) arrays. Euclidean distances use the
+    BLAS-backed expansion |a|^2 + |b|^2 - 2ab; other metrics go through
+    scipy's cdist. Work is done chunk_rows rows of a at a time, and
+    dtype=np.float32 halves the memory of the result.
+    """
+    a = np.atleast_2d(np.asarray(a, dtype=dtype))
+    b = np.atleast_2d(np.asarray(b, dtype=dtype))
+    out = np.empty((len(a), len(b)), dtype=dtype)
+    if metric == "euclidean":
+        b_squared = np.einsum("ij,ij->i", b, b)
+    else:
+        from scipy.spatial.distance import cdist
+
+    for start in range(0, len(a), chunk_rows):
+        block = a[start:start + chunk_rows]
+        target = out[start:start + len(block)]
+        if metric == "euclidean":
+            np.matmul(block, b.T, out=target)
+            target *= -2
+            target += np.einsum("ij,ij->i", block, block)[:, None]
+            target += b_squared
+            # Rounding can leave tiny negatives where rows coincide.
+            np.maximum(target, 0, out=target)
+            np.sqrt(target, out=target)
+        else:
+            target[:] = cdist(block, b, metric=metric)
+    return out
+
+
+def paired_distances(a, b):
+    """Euclidean distance between a[i] and b[i] for every i."""
+    difference = np.asarray(a) - np.asarray(b)
+    return np.sqrt(np.einsum("ij,ij->i", difference, difference))
+
+
+def downsample_frames(frames, max_frames):
+    """Average consecutive rows so at most max_frames remain.
+
+    Returns the pooled frames and the pooling factor, which maps indices in
+    the original sequence to the pooled one by integer division.
+    """
+    frames = np.asarray(frames)
+    factor = max(1, int(np.ceil(len(frames) / max_frames)))
+    if factor == 1:
+        return frames, 1
+    pad = -len(frames) % factor
+    padded = np.pad(frames, ((0, pad), (0, 0)), mode="edge")
+    return padded.reshape(-1, factor, frames.shape[1]).mean(axis=1), factor
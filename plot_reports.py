@@ -0,0 +1,222 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import matplotlib
+
+# Headless backend: reports are written to files, never shown.
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from analysis_audio import ANALYSIS_RATE  # noqa: E402
+from batch_score import read_pairs  # noqa: E402
+
+SAMPLE_RATE = ANALYSIS_RATE
+# Cap on points per waveform line and cells per distance-image axis.
+MAX_WAVEFORM_POINTS = 4000
+MAX_IMAGE_FRAMES = 800
+FORMATS = ("png", "svg")
+
+
+@dataclass
+class ReportData:
+    """Everything drawn in one pair report, computed without matplotlib."""
+
+    title: str
+    mfcc1: np.ndarray
+    mfcc2: np.ndarray
+    time1: np.ndarray
+    wave1: np.ndarray
+    time2: np.ndarray
+    wave2: np.ndarray
+    distances: np.ndarray
+    path: np.ndarray
+    alignment_distance: float
+    cosine_similarity: float
+
+
+def waveform_envelope(audio, sr, points=MAX_WAVEFORM_POINTS):
+    """Time axis and min/max envelope of audio, at most points samples long."""
+    audio = np.asarray(audio)
+    bins = max(1, points // 2)
+    size = max(1, int(np.ceil(len(audio) / bins)))
+    if size == 1:
+        return np.arange(len(audio)) / sr, audio
+    padded = np.pad(audio, (0, -len(audio) % size))
+    blocks = padded.reshape(-1, size)
+    envelope = np.empty(2 * len(blocks), dtype=audio.dtype)
+    envelope[0::2] = blocks.min(axis=1)
+    envelope[1::2] = blocks.max(axis=1)
+    return np.repeat(np.arange(len(blocks)) * size / sr, 2), envelope
+
+
+def compute_report(item_id, file1, file2, sr=SAMPLE_RATE, band=0.1):
+    """Reduce a pair to the arrays a report draws, from the cached analysis audio."""
+    import dtw_engine
+    import feature_cache
+    import pairwise
+    from analysis_audio import load_pcm
+
+    audio1, _ = load_pcm(file1, sr=sr)
+    audio2, _ = load_pcm(file2, sr=sr)
+    mfcc1 = np.asarray(feature_cache.mfcc(file1, sr=sr, n_mfcc=13)[0])
+    mfcc2 = np.asarray(feature_cache.mfcc(file2, sr=sr, n_mfcc=13)[0])
+    frames1, frames2 = mfcc1.T, mfcc2.T
+
+    window = dtw_engine.band_radius(len(frames1), len(frames2), band)
+    distance, path = dtw_engine.dtw_distance(frames1, frames2, window=window, return_path=True)
+    pooled1, factor1 = pairwise.downsample_frames(frames1, MAX_IMAGE_FRAMES)
+    pooled2, factor2 = pairwise.downsample_frames(frames2, MAX_IMAGE_FRAMES)
+    distances = pairwise.pairwise_distances(pooled1, pooled2, dtype=np.float32)
+
+    mean1, mean2 = mfcc1.mean(axis=1), mfcc2.mean(axis=1)
+    cosine_similarity = float(mean1 @ mean2 / (np.linalg.norm(mean1) * np.linalg.norm(mean2)))
+    time1, wave1 = waveform_envelope(audio1, sr)
+    time2, wave2 = waveform_envelope(audio2, sr)
+    return ReportData(
+        title=item_id,
+        mfcc1=mfcc1.astype(np.float32),
+        mfcc2=mfcc2.astype(np.float32),
+        time1=time1,
+        wave1=wave1,
+        time2=time2,
+        wave2=wave2,
+        distances=distances,
+        path=path / [factor1, factor2],
+        alignment_distance=distance,
+        cosine_similarity=cosine_similarity,
+    )
+
+
+class ReportFigure:
+    """One figure whose artists are updated in place for each report.
+
+    Building the axes, images and colorbars once and only swapping their
+    data is much cheaper than a new figure per report.
+    """
+
+    def __init__(self, dpi=100):
+        self.figure, axes = plt.subplots(2, 2, figsize=(14, 9), dpi=dpi)
+        (self.mfcc1_ax, self.mfcc2_ax), (self.wave_ax, self.dtw_ax) = axes
+        empty = np.zeros((2, 2))
+        self.mfcc1_image = self._image(self.mfcc1_ax, empty, "coolwarm", "MFCC: Synthesized")
+        self.mfcc2_image = self._image(self.mfcc2_ax, empty, "coolwarm", "MFCC: Reference")
+        for ax in (self.mfcc1_ax, self.mfcc2_ax):
+            ax.set_xlabel("Time Frames")
+            ax.set_ylabel("MFCC Coefficients")
+        self.dtw_image = self._image(self.dtw_ax, empty, "Blues", "DTW Path")
+        (self.path_line,) = self.dtw_ax.plot([], [], color="red", linewidth=1)
+        self.dtw_ax.set_xlabel("Reference Frames")
+        self.dtw_ax.set_ylabel("Synthesized Frames")
+        (self.wave1_line,) = self.wave_ax.plot([], [], label="Synthesized", alpha=0.7,
+                                               linewidth=0.5)
+        (self.wave2_line,) = self.wave_ax.plot([], [], label="Reference", alpha=0.7,
+                                               linewidth=0.5)
+        self.wave_ax.set_title("Waveforms")
+        self.wave_ax.set_xlabel("Time (s)")
+        self.wave_ax.set_ylabel("Amplitude")
+        self.wave_ax.legend(loc="upper right")
+        self.figure.tight_layout(rect=(0, 0, 1, 0.95))
+
+    def _image(self, ax, data, cmap, title):
+        image = ax.imshow(data, aspect="auto", cmap=cmap, origin="lower",
+                          interpolation="nearest", rasterized=True)
+        self.figure.colorbar(image, ax=ax)
+        ax.set_title(title)
+        return image
+
+    @staticmethod
+    def _show(image, data):
+        image.set_data(data)
+        image.set_extent((-0.5, data.shape[1] - 0.5, -0.5, data.shape[0] - 0.5))
+        image.set_clim(float(np.min(data)), float(np.max(data)))
+
+    def render(self, report, output):
+        self._show(self.mfcc1_image, report.mfcc1)
+        self._show(self.mfcc2_image, report.mfcc2)
+        self._show(self.dtw_image, report.distances)
+        self.path_line.set_data(report.path[:, 1], report.path[:, 0])
+        self.wave1_line.set_data(report.time1, report.wave1)
+        self.wave2_line.set_data(report.time2, report.wave2)
+        self.wave_ax.relim()
+        self.wave_ax.autoscale_view()
+        self.figure.suptitle(
+            f"{report.title}: DTW {report.alignment_distance:.1f}, "
+            f"cosine {report.cosine_similarity:.4f}"
+        )
+        self.figure.savefig(output)
+
+
+_figure = None
+
+
+def _init_worker(dpi):
+    global _figure
+    _figure = ReportFigure(dpi=dpi)
+
+
+def render_pair(task):
+    """Compute and write one report in a worker; returns (id, output, error)."""
+    (item_id, file1, file2), output, sr, band = task
+    try:
+        _figure.render(compute_report(item_id, file1, file2, sr=sr, band=band), output)
+    # Decoders raise a variety of types; one bad file must not stop the run.
+    except Exception as error:
+        return item_id, None, f"{type(error).__name__}: {error}"
+    return item_id, output, None
+
+
+def render_reports(manifest, output_dir, fmt="png", sr=SAMPLE_RATE, band=0.1, workers=None,
+                   dpi=100, chunksize=4):
+    """Write one diagnostic report per manifest pair, rendering across processes."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}; available: {list(FORMATS)}")
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [
+        (pair, os.path.join(output_dir, f"{pair[0]}.{fmt}"), sr, band)
+        for pair in read_pairs(manifest)
+    ]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dpi,)) as pool:
+        for count, result in enumerate(pool.map(render_pair, tasks, chunksize=chunksize), 1):
+            results.append(result)
+            print(f"\r[{count}/{len(tasks)}]", end="", file=sys.stderr)
+    if tasks:
+        print(file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write comparison plots for every pair in a manifest without a display."
+    )
+    parser.add_argument("manifest", help="CSV or JSONL with 'synthesized' and 'reference' paths")
+    parser.add_argument("output_dir", help="Directory for the report images")
+    parser.add_argument("--format", default="png", choices=FORMATS)
+    parser.add_argument("--sr", type=int, default=SAMPLE_RATE, help="Analysis rate")
+    parser.add_argument("--band", type=float, default=0.1, help="DTW band fraction")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = render_reports(
+        args.manifest, args.output_dir, fmt=args.format, sr=args.sr, band=args.band,
+        workers=args.workers, dpi=args.dpi,
+    )
+    elapsed = time.perf_counter() - start
+    for item_id, _, error in results:
+        if error:
+            print(f"{item_id}: {error}", file=sys.stderr)
+    written = sum(1 for _, output, _ in results if output)
+    print(f"Wrote {written} reports in {elapsed:.1f} s ({written / elapsed:.2f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.spatial.distance import cosine
 
+import feature_cache
+from analysis_audio import load_pcm
+
 def load_audio_features(file_path):
     """
     Load audio and extract MFCC features.
     """
-    # Load the audio file
-    y, sr = librosa.load(file_path, sr=None)
-    # Extract MFCC features
-    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-    # Compute the mean of MFCC across time
-    mfcc_mean = np.mean(mfcc, axis=1)
-    return mfcc_mean
+    # MFCCs are cached per file content, so repeat calls skip the decode
+    return feature_cache.mfcc_mean(file_path, n_mfcc=13)
 
 def calculate_similarity(feature1, feature2):
     """
@@ -35,8 +33,7 @@ def plot_spectrogram(file_path, ax, title):
     """
     Plot the spectrogram of an audio file.
     """
-    y, sr = librosa.load(file_path, sr=None)
-    S = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128, fmax=8000)
+    S, sr = feature_cache.melspectrogram(file_path, n_mels=128, fmax=8000)
     S_dB = librosa.power_to_db(S, ref=np.max)
     img = librosa.display.specshow(S_dB, x_axis='time', y_axis='mel', sr=sr, fmax=8000, ax=ax)
     ax.set_title(title)
@@ -46,13 +43,9 @@ def plot_overlapped_waveforms(file1, file2):
     """
     Plot overlapped waveforms of two audio files.
     """
-    y1, sr1 = librosa.load(file1, sr=None)
-    y2, sr2 = librosa.load(file2, sr=None)
-    
-    # Resample if sampling rates are different
-    if sr1 != sr2:
-        y2 = librosa.resample(y2, orig_sr=sr2, target_sr=sr1)
-        sr2 = sr1
+    # Decoded once to the shared analysis rate, so no resampling is needed here
+    y1, sr1 = load_pcm(file1)
+    y2, sr2 = load_pcm(file2)
     
     # Normalize both waveforms for better comparison
     y1 = y1 / np.max(np.abs(y1))
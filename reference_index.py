@@ -0,0 +1,213 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+import dtw_engine
+import feature_cache
+from analysis_audio import ANALYSIS_RATE
+from settings import cache_path
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg")
+# Every reference and query is analysed at one rate so MFCC frames line up.
+SAMPLE_RATE = ANALYSIS_RATE
+N_MFCC = 13
+EMBEDDINGS_FILE = "embeddings.npy"
+FILES_FILE = "files.json"
+
+
+@dataclass
+class Match:
+    """One reference recording ranked against a query."""
+
+    file: str
+    cosine_similarity: float
+    dtw_distance: float
+
+
+def default_index_dir(reference_dir):
+    """Cache directory holding the index of reference_dir."""
+    digest = hashlib.sha256(os.path.abspath(reference_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.dirname(cache_path("references", digest, FILES_FILE))
+
+
+def find_audio_files(reference_dir):
+    """Sorted paths of every audio file below reference_dir."""
+    found = []
+    for root, _, names in os.walk(reference_dir):
+        for name in names:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def embed(file_path):
+    """Unit-length time-averaged MFCC vector of a file."""
+    vector = feature_cache.mfcc_mean(file_path, sr=SAMPLE_RATE, n_mfcc=N_MFCC)
+    return (vector / (np.linalg.norm(vector) or 1.0)).astype(np.float32)
+
+
+def mfcc_frames(file_path):
+    """(frames, coefficients) MFCC matrix of a file, as used for DTW."""
+    return np.asarray(feature_cache.mfcc(file_path, sr=SAMPLE_RATE, n_mfcc=N_MFCC)[0]).T
+
+
+class ReferenceIndex:
+    """Pooled MFCC embeddings of a set of reference recordings.
+
+    Queries take the cosine top-k over all embeddings in one matrix
+    product, then rerank only those k with banded DTW over MFCC frames.
+    """
+
+    def __init__(self, files, digests, embeddings):
+        self.files = files
+        self.digests = digests
+        self.embeddings = embeddings
+
+    def __len__(self):
+        return len(self.files)
+
+    @classmethod
+    def build(cls, reference_dir, index_dir=None, save=True):
+        """Index every audio file below reference_dir and save the index.
+
+        Embeddings of files whose content is unchanged since the previous
+        build are reused. save=False leaves saving to the caller.
+        """
+        index_dir = index_dir or default_index_dir(reference_dir)
+        try:
+            previous = cls.load(index_dir)
+        except (OSError, ValueError):
+            # Missing, inconsistent or built at another analysis rate.
+            known = {}
+        else:
+            known = dict(zip(previous.digests, previous.embeddings))
+
+        files = find_audio_files(reference_dir)
+        digests = [feature_cache.file_digest(path) for path in files]
+        embeddings = np.empty((len(files), N_MFCC), dtype=np.float32)
+        for row, (path, digest) in enumerate(zip(files, digests)):
+            embeddings[row] = known[digest] if digest in known else embed(path)
+
+        index = cls(files, digests, embeddings)
+        if save:
+            index.save(index_dir)
+        return index
+
+    def save(self, index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        embeddings_path = os.path.join(index_dir, EMBEDDINGS_FILE)
+        np.save(f"{embeddings_path}.{suffix}.npy", self.embeddings)
+        os.replace(f"{embeddings_path}.{suffix}.npy", embeddings_path)
+        files_path = os.path.join(index_dir, FILES_FILE)
+        with open(f"{files_path}.{suffix}", "w", encoding="utf-8") as f:
+            json.dump(
+                {"sample_rate": SAMPLE_RATE, "files": self.files, "digests": self.digests},
+                f, ensure_ascii=False,
+            )
+        os.replace(f"{files_path}.{suffix}", files_path)
+
+    @classmethod
+    def load(cls, index_dir):
+        """Open a saved index, memory-mapping its embeddings."""
+        with open(os.path.join(index_dir, FILES_FILE), "r", encoding="utf-8") as f:
+            listing = json.load(f)
+        if listing.get("sample_rate") != SAMPLE_RATE:
+            raise ValueError(f"Reference index in {index_dir} uses another analysis rate")
+        embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        if len(embeddings) != len(listing["files"]):
+            raise ValueError(f"Reference index in {index_dir} is inconsistent")
+        return cls(listing["files"], listing["digests"], embeddings)
+
+    def prefilter(self, query_file, k=50):
+        """Indices and cosine similarities of the k closest embeddings, best first."""
+        similarities = self.embeddings @ embed(query_file)
+        k = min(k, len(similarities))
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+        candidates = candidates[np.argsort(-similarities[candidates])]
+        return candidates, similarities[candidates]
+
+    def query(self, query_file, k=50, top=5, band=0.1):
+        """The top references for query_file, ranked by banded DTW distance.
+
+        Only the k cosine-nearest references are aligned. Each alignment is
+        abandoned once it cannot beat the current top-th distance, and
+        candidates whose LB_Keogh bound is already worse are skipped.
+        """
+        if not len(self):
+            return []
+        candidates, similarities = self.prefilter(query_file, k)
+        query_frames = mfcc_frames(query_file)
+
+        scored = []
+        for row, similarity in zip(candidates, similarities):
+            frames = mfcc_frames(self.files[row])
+            window = dtw_engine.band_radius(len(query_frames), len(frames), band)
+            scored.append((frames, window, row, float(similarity)))
+        bounds = [
+            dtw_engine.lb_keogh(query_frames, frames, window) for frames, window, _, _ in scored
+        ]
+
+        matches = []
+        threshold = None
+        for position in np.argsort(bounds):
+            if threshold is not None and bounds[position] >= threshold:
+                break
+            frames, window, row, similarity = scored[position]
+            distance = dtw_engine.dtw_distance(
+                query_frames, frames, window=window, threshold=threshold
+            )
+            if np.isinf(distance):
+                continue
+            matches.append(Match(self.files[row], similarity, distance))
+            matches.sort(key=lambda match: match.dtw_distance)
+            del matches[top:]
+            if len(matches) == top:
+                threshold = matches[-1].dtw_distance
+        return matches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find which reference recitation a recording matches."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Index a directory of references")
+    build_parser.add_argument("reference_dir")
+    build_parser.add_argument("--index-dir", help="Where to store the index")
+    query_parser = subparsers.add_parser("query", help="Rank references for a recording")
+    query_parser.add_argument("reference_dir")
+    query_parser.add_argument("audio_file")
+    query_parser.add_argument("--index-dir", help="Where the index is stored")
+    query_parser.add_argument("-k", type=int, default=50, help="Cosine prefilter size")
+    query_parser.add_argument("--top", type=int, default=5, help="Matches to report")
+    query_parser.add_argument("--band", type=float, default=0.1, help="DTW band fraction")
+    args = parser.parse_args(argv)
+
+    index_dir = args.index_dir or default_index_dir(args.reference_dir)
+    if args.command == "build":
+        index = ReferenceIndex.build(args.reference_dir, index_dir)
+        print(f"Indexed {len(index)} recordings in {index_dir}")
+        return
+
+    try:
+        index = ReferenceIndex.load(index_dir)
+    except (OSError, ValueError):
+        index = ReferenceIndex.build(args.reference_dir, index_dir, save=False)
+        try:
+            index.save(index_dir)
+        except OSError:
+            # An unwritable cache only means rebuilding on the next query.
+            pass
+    for rank, match in enumerate(index.query(args.audio_file, args.k, args.top, args.band), 1):
+        print(f"{rank}. {match.file}  DTW {match.dtw_distance:.2f}  "
+              f"cosine {match.cosine_similarity:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Single entry point for every tool in the repo. Each mode imports its
+# backends and analysis libraries inside its handler, so transliterating a
+# line never loads numpy, librosa, pygame or a TTS client.
+
+# Modules whose main(argv) takes over the rest of the command line.
+DELEGATED = {
+    "serve": "tts_server",
+    "batch": "batch_synthesize",
+    "score": "batch_score",
+    "index": "reference_index",
+    "report": "plot_reports",
+    "daemon": "tts_daemon",
+    "script": "script_id",
+    "bench": "benchmark",
+}
+
+# What each mode imports before doing any work, timed by bench-imports.
+IMPORT_SNIPPETS = {
+    "baseline": "pass",
+    "transliterate": "import schemes; schemes.transliterate('धर्मक्षेत्रे', 'iast')",
+    "speak": "import schemes, script_id, backends, chunked_synthesis, synthesis_cache",
+    "compare": "import comparison",
+    "compare-full": "import comparison, librosa, librosa.sequence, sklearn.preprocessing",
+    "serve": "import tts_server",
+    "score": "import batch_score, comparison",
+    "index": "import reference_index",
+    "report": "import plot_reports",
+    "daemon-client": "import tts_daemon",
+}
+
+
+def transliterate_command(args):
+    from schemes import transliterate
+
+    print(transliterate(args.text, args.scheme))
+
+
+def speak_command(args):
+    from backends import get_backend
+    from script_id import prepare_text
+
+    backend = get_backend(args.backend, lang=args.lang)
+    english_text = prepare_text(args.text, args.scheme)
+    fields = dict(scheme=args.scheme, **backend.cache_fields())
+    if args.play:
+        from streaming_playback import stream_passage
+
+        stream_passage(english_text, backend.synthesize, fmt=backend.fmt, **fields)
+        return
+    from audio_buffers import save_bytes
+    from chunked_synthesis import synthesize_passage_bytes
+
+    data = synthesize_passage_bytes(english_text, backend.synthesize, fmt=backend.fmt, **fields)
+    print(save_bytes(data, args.output or f"output.{backend.fmt}"))
+
+
+def compare_command(args):
+    from comparison import compare
+
+    report = compare(args.file1, args.file2, metrics=args.metrics.split(","), sr=args.sr or None)
+    if args.json:
+        print(report.to_json(ensure_ascii=False))
+        return
+    for name, value in report.to_dict().items():
+        if value is not None and name not in ("file1", "file2", "metrics"):
+            print(f"{name}: {value}")
+
+
+def time_import(snippet, repeat=5):
+    """Median wall time in ms of a fresh interpreter running snippet, or None."""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    # One untimed run warms the bytecode and OS file caches.
+    for run in range(repeat + 1):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", snippet], cwd=cwd, capture_output=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            return None
+        if run:
+            samples.append(elapsed * 1000)
+    return statistics.median(samples)
+
+
+def bench_imports_command(args):
+    modes = args.modes.split(",") if args.modes else list(IMPORT_SNIPPETS)
+    unknown = set(modes) - set(IMPORT_SNIPPETS)
+    if unknown:
+        raise SystemExit(f"Unknown modes: {sorted(unknown)}; available: {list(IMPORT_SNIPPETS)}")
+    results = {}
+    for mode in modes:
+        median = time_import(IMPORT_SNIPPETS[mode], repeat=args.repeat)
+        results[mode] = None if median is None else round(median, 1)
+        print(f"{mode}: {'unavailable' if median is None else f'{median:.1f} ms'}",
+              file=sys.stderr)
+    print(json.dumps({"unit": "ms", "repeat": args.repeat, "import_time": results}, indent=2))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        return importlib.import_module(DELEGATED[argv[0]]).main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        prog="sanskrit_tts",
+        description="Sanskrit text-to-speech tools. Also: "
+                    + ", ".join(f"{mode} (see {mode} --help)" for mode in DELEGATED),
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_t = subparsers.add_parser("transliterate", help="Romanize Devanagari text")
+    parser_t.add_argument("text")
+    parser_t.add_argument("--scheme", default="iast", help="Transliteration scheme")
+    parser_t.set_defaults(handler=transliterate_command)
+
+    parser_s = subparsers.add_parser("speak", help="Synthesize Devanagari text")
+    parser_s.add_argument("text")
+    parser_s.add_argument("--scheme", default="iast", help="Transliteration scheme")
+    parser_s.add_argument("--backend", default="gtts", help="Synthesis backend")
+    parser_s.add_argument("--lang", default="hi", help="Backend language code")
+    parser_s.add_argument("--output", help="Audio file to write (default output.<fmt>)")
+    parser_s.add_argument("--play", action="store_true", help="Play instead of saving")
+    parser_s.set_defaults(handler=speak_command)
+
+    parser_c = subparsers.add_parser("compare", help="Compare two recordings")
+    parser_c.add_argument("file1")
+    parser_c.add_argument("file2")
+    parser_c.add_argument("--metrics", default="hash,alignment",
+                          help="Comma-separated comparison metrics")
+    parser_c.add_argument("--sr", type=int, default=16000,
+                          help="Analysis rate (0 keeps native rates)")
+    parser_c.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser_c.set_defaults(handler=compare_command)
+
+    parser_b = subparsers.add_parser("bench-imports", help="Time the imports of each mode")
+    parser_b.add_argument("--modes", help=f"Comma-separated subset of {list(IMPORT_SNIPPETS)}")
+    parser_b.add_argument("--repeat", type=int, default=5, help="Timed runs per mode")
+    parser_b.set_defaults(handler=bench_imports_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
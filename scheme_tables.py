@@ -0,0 +1,49 @@
+"""Transliteration tables shared by the text-to-speech scripts."""
+
+IAST = {
+    "a": "अ", "ā": "आ", "i": "इ", "ī": "ई", "u": "उ", "ū": "ऊ", "ṛ": "ऋ", "ṝ": "ॠ",
+    "ḷ": "ऌ", "ḹ": "ॡ", "e": "ए", "ai": "ऐ", "o": "ओ", "au": "औ", "ĕ": "ऎ", "ŏ": "ऒ", "æ": "ऍ", "ǣ": "एॕ", "ô": "ऑ",
+    "aṃ": "अं", "aḥ": "अः", "am̐": "अँ",
+    "ka": "क", "kha": "ख", "ga": "ग", "gha": "घ", "ṅa": "ङ", "ca": "च", "cha": "छ",
+    "ja": "ज", "jha": "झ", "ña": "ञ", "ṭa": "ट", "ṭha": "ठ", "ḍa": "ड", "ḍha": "ढ",
+    "ṇa": "ण", "ta": "त", "tha": "थ", "da": "द", "dha": "ध", "na": "न", "pa": "प",
+    "pha": "फ", "ba": "ब", "bha": "भ", "ma": "म", "ya": "य", "ra": "र", "la": "ल",
+    "va": "व", "śa": "श", "ṣa": "ष", "sa": "स", "ha": "ह"
+}
+
+HARVARD_KYOTO = {
+    'अ': 'a','आ': 'aa','इ': 'i','ई': 'ii','उ': 'u','ऊ': 'uu','ऋ': 'R^i','ॠ': 'R^ii','ऌ': 'L^i','ॡ': 'L^ii',
+    'ए': 'e','ऐ': 'ai','ओ': 'o','औ': 'au','ं': 'M','ः': 'H','क': 'ka','ख': 'kha','ग': 'ga','घ': 'gha',
+    'ङ': 'N^a','च': 'cha','छ': 'chha','ज': 'ja','झ': 'jha','ञ': '~na','ट': 'Ta','ठ': 'Tha','ड': 'Da','ढ': 'Dha','ण': 'Na',
+    'त': 'ta','थ': 'tha','द': 'da','ध': 'dha','न': 'na','प': 'pa','फ': 'pha','ब': 'ba','भ': 'bha','म': 'ma',
+    'य': 'ya','र': 'ra','ल': 'la','व': 'va','श': 'sha','ष': 'Sha','स': 'sa','ह': 'ha','क्ष': 'kSha','त्र': 'tra','ज्ञ': 'dnya'
+}
+
+ITRANS = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu', 'ए': 'e', 'ऐ': 'ai',
+    'ओ': 'o', 'औ': 'au', 'ऋ': 'RRi', 'ॠ': 'RRI', 'ऌ': 'LLi', 'ॡ': 'LLI',
+    'ं': 'M', 'ः': 'H', 'ँ': 'M', 'ऽ': "'", '्': '', 'ॐ': 'OM', '।': '|', '॥': '||',
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'N', 'च': 'ch', 'छ': 'Ch', 'ज': 'j',
+    'झ': 'jh', 'ञ': 'JN', 'ट': 'T', 'ठ': 'Th', 'ड': 'D', 'ढ': 'Dh', 'ण': 'N',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n', 'प': 'p', 'फ': 'ph', 'ब': 'b',
+    'भ': 'bh', 'म': 'm', 'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'v', 'श': 'sh', 'ष': 'Sh',
+    'स': 's', 'ह': 'h', 'ळ': 'L', 'क्ष': 'kSh', 'त्र': 'tra', 'ज्ञ': 'dnya', 'श्र': 'shra'
+}
+
+BASIC = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
+    'ऋ': 'R', 'ॠ': 'RR', 'ऌ': 'L', 'ॡ': 'LL',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+    'ं': 'M', 'ः': 'H', 'ँ': '~',
+    'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
+    'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nja',
+    'ट': 'Ta', 'ठ': 'Tha', 'ड': 'Da', 'ढ': 'Dha', 'ण': 'Na',
+    'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
+    'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
+    'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va', 'श': 'sha',
+    'ष': 'Sha', 'स': 'sa', 'ह': 'ha',
+    'क्ष': 'ksha', 'त्र': 'tra', 'ज्ञ': 'gya',
+    'अं': 'aM', 'अः': 'aH', 'अँ': 'a~',
+    '०': '0', '१': '1', '२': '2', '३': '3', '४': '4',
+    '५': '5', '६': '6', '७': '7', '८': '8', '९': '9'
+}
@@ -0,0 +1,156 @@
+import functools
+import glob
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+import telemetry
+from settings import cache_path
+from transliteration import Transliterator
+
+# Bump when the compiled layout changes; marshal output is also tied to the
+# interpreter version, so both go into the cache file name.
+COMPILED_FORMAT = 1
+
+BUILTIN_SCHEMES = {
+    "iast": "IAST",
+    "harvard_kyoto": "HARVARD_KYOTO",
+    "itrans": "ITRANS",
+    "basic": "BASIC",
+}
+
+SCHEME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scheme_json")
+TABLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scheme_tables.py")
+
+_registry = {}
+
+
+def _compiled_file(digest):
+    tag = f"v{COMPILED_FORMAT}-py{sys.version_info[0]}{sys.version_info[1]}"
+    return cache_path("schemes", f"{digest}-{tag}.marshal")
+
+
+def _load_compiled(digest):
+    try:
+        with open(_compiled_file(digest), "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _store_compiled(digest, compiled):
+    path = _compiled_file(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump(compiled, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only cache only costs a recompile on the next start.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _compile_cached(digest, load_mapping):
+    compiled = _load_compiled(digest)
+    if compiled is not None:
+        return Transliterator.from_compiled(*compiled)
+    transliterator = Transliterator(load_mapping())
+    _store_compiled(digest, (transliterator.transitions, transliterator.outputs))
+    return transliterator
+
+
+@functools.lru_cache(maxsize=None)
+def _tables_digest():
+    with open(TABLES_FILE, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _builtin_digest(name, kind):
+    return hashlib.sha256(f"{_tables_digest()}:{name}:{kind}".encode("utf-8")).hexdigest()
+
+
+def _builtin_table(name):
+    # Only imported when a compiled table is missing from the cache.
+    import scheme_tables
+
+    return getattr(scheme_tables, BUILTIN_SCHEMES[name])
+
+
+@functools.lru_cache(maxsize=None)
+def get_syllabifier(name):
+    """Return the akshara-aware romanizer for a built-in scheme.
+
+    Its tables are compiled through the same disk cache as the schemes.
+    """
+    from syllabifier import Syllabifier
+
+    digest = _builtin_digest(name, "syllabifier")
+    compiled = _load_compiled(digest)
+    if compiled is not None:
+        return Syllabifier.from_compiled(*compiled)
+    syllabifier = Syllabifier(_builtin_table(name))
+    _store_compiled(digest, syllabifier.compiled())
+    return syllabifier
+
+
+def register_scheme(name, mapping):
+    """Register a mapping table under name, compiling it through the disk cache."""
+    canonical = json.dumps(mapping, ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    _registry[name] = _compile_cached(digest, lambda: mapping)
+    return _registry[name]
+
+
+def register_json_scheme(name, path):
+    """Register a JSON mapping file; the JSON is only parsed on a cache miss."""
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    _registry[name] = _compile_cached(digest, lambda: json.loads(content.decode("utf-8")))
+    return _registry[name]
+
+
+def get_transliterator(name):
+    """Return the compiled longest-match transliterator registered under name.
+
+    Built-in tables are only compiled when first asked for, since
+    transliterate() reads them with the syllabifier instead.
+    """
+    if name not in _registry and name in BUILTIN_SCHEMES:
+        _registry[name] = _compile_cached(_builtin_digest(name, "trie"),
+                                          lambda: _builtin_table(name))
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown transliteration scheme {name!r}; available: {available_schemes()}"
+        ) from None
+
+
+def transliterate(text, scheme):
+    """Romanize text with a registered scheme.
+
+    Built-in tables go through the akshara-aware syllabifier; other
+    registered schemes use their compiled longest-match table.
+    """
+    with telemetry.span("transliterate", scheme=scheme):
+        if scheme in BUILTIN_SCHEMES:
+            return get_syllabifier(scheme).romanize(text)
+        return get_transliterator(scheme).transliterate(text)
+
+
+def available_schemes():
+    """List the names of all built-in and registered schemes."""
+    return sorted(set(BUILTIN_SCHEMES) | set(_registry))
+
+
+def _load_json_schemes():
+    for path in sorted(glob.glob(os.path.join(SCHEME_DIR, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0].lower()
+        register_json_scheme(name, path)
+
+
+_load_json_schemes()
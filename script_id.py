@@ -0,0 +1,315 @@
+import argparse
+import bisect
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass
+
+import telemetry
+
+# numpy is only imported for long texts and corpora, so tagging a request
+# costs no more startup than transliterating it.
+
+SCRIPTS = (
+    "common", "latin", "devanagari", "bengali", "gurmukhi", "gujarati", "oriya", "tamil",
+    "telugu", "kannada", "malayalam", "sinhala", "tibetan", "arabic", "cyrillic", "greek",
+    "cjk", "other",
+)
+COMMON = SCRIPTS.index("common")
+DEVANAGARI = SCRIPTS.index("devanagari")
+
+# (first codepoint, script) for consecutive ranges; each range runs up to the
+# next start. "common" covers digits, punctuation, spaces, joiners, combining
+# marks and the dandas, which every Indic script shares; it takes the script
+# of the text around it.
+BLOCKS = (
+    (0x0000, "common"), (0x0041, "latin"), (0x005B, "common"), (0x0061, "latin"),
+    (0x007B, "common"), (0x00C0, "latin"), (0x00D7, "common"), (0x00D8, "latin"),
+    (0x00F7, "common"), (0x00F8, "latin"), (0x02B0, "common"), (0x0370, "greek"),
+    (0x0400, "cyrillic"), (0x0530, "other"), (0x0600, "arabic"), (0x0700, "other"),
+    (0x0900, "devanagari"), (0x0964, "common"), (0x0966, "devanagari"), (0x0980, "bengali"),
+    (0x0A00, "gurmukhi"), (0x0A80, "gujarati"), (0x0B00, "oriya"), (0x0B80, "tamil"),
+    (0x0C00, "telugu"), (0x0C80, "kannada"), (0x0D00, "malayalam"), (0x0D80, "sinhala"),
+    (0x0E00, "other"), (0x0F00, "tibetan"), (0x1000, "other"),
+    # Vedic accents and marks.
+    (0x1CD0, "devanagari"), (0x1D00, "other"),
+    # Latin Extended Additional holds most IAST letters (ṛ ṣ ṇ ḥ ...).
+    (0x1E00, "latin"), (0x1F00, "greek"), (0x2000, "common"), (0x2C00, "other"),
+    (0x3000, "common"), (0x3040, "cjk"), (0xA000, "other"),
+    (0xA8E0, "devanagari"), (0xA900, "other"), (0xAC00, "cjk"), (0xD7B0, "other"),
+    (0xFE00, "common"), (0xFFF0, "other"),
+)
+BLOCK_STARTS = [start for start, _ in BLOCKS]
+BLOCK_SCRIPTS = [SCRIPTS.index(script) for _, script in BLOCKS]
+
+# Below this many codepoints the pure-Python path is faster than numpy.
+SCALAR_LIMIT = 512
+# Lines classified per vectorized pass in batch mode, to bound memory.
+BATCH_LINES = 20000
+
+# Frequent words that only one of the two Devanagari languages uses.
+HINDI_WORDS = frozenset(
+    "है हैं था थी थे के की का में से को और नहीं भी यह वह लोग साथ रहे रहा रही हो गया".split()
+)
+SANSKRIT_WORDS = frozenset("इति च तु अपि एव हि स्म अस्ति न वा यथा तथा सह".split())
+VISARGA = "ः"
+VIRAMA = "्"
+NUKTA = "़"
+WORD_PUNCTUATION = "।॥|,.;:!?\"'()0123456789०१२३४५६७८९"
+
+
+@dataclass
+class Run:
+    """A maximal stretch of text in one script."""
+
+    script: str
+    start: int
+    end: int
+    text: str
+
+
+def _script_ids_scalar(text):
+    return [BLOCK_SCRIPTS[bisect.bisect_right(BLOCK_STARTS, ord(char)) - 1] for char in text]
+
+
+def _script_ids_array(text):
+    import numpy as np
+
+    codepoints = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    starts = np.asarray(BLOCK_STARTS, dtype=np.uint32)
+    scripts = np.asarray(BLOCK_SCRIPTS, dtype=np.uint8)
+    return scripts[np.searchsorted(starts, codepoints, side="right") - 1]
+
+
+def script_ids(text):
+    """Index into SCRIPTS of every character of text (a list or an array)."""
+    if len(text) < SCALAR_LIMIT:
+        return _script_ids_scalar(text)
+    return _script_ids_array(text)
+
+
+def script_of(char):
+    return SCRIPTS[_script_ids_scalar(char)[0]]
+
+
+def histogram(text):
+    """Count of characters per script, leaving out common characters."""
+    ids = script_ids(text)
+    if isinstance(ids, list):
+        counts = [0] * len(SCRIPTS)
+        for script in ids:
+            counts[script] += 1
+    else:
+        import numpy as np
+
+        counts = np.bincount(ids, minlength=len(SCRIPTS)).tolist()
+    return {SCRIPTS[i]: count for i, count in enumerate(counts) if count and i != COMMON}
+
+
+def identify(text):
+    """The script most of text's letters are in, or "common" if it has none."""
+    counts = histogram(text)
+    return max(counts, key=counts.get) if counts else "common"
+
+
+def _run_starts_scalar(ids):
+    """Start index and script of each run, with common characters absorbed."""
+    runs = []
+    for i, script in enumerate(ids):
+        if script == COMMON:
+            continue
+        if not runs:
+            # Leading common characters belong to the first run.
+            runs.append((0, script))
+        elif script != runs[-1][1]:
+            runs.append((i, script))
+    return runs or [(0, COMMON)]
+
+
+def _run_starts_array(ids):
+    import numpy as np
+
+    letters = np.flatnonzero(ids != COMMON)
+    if not len(letters):
+        return [(0, COMMON)]
+    scripts = ids[letters]
+    changes = np.flatnonzero(scripts[1:] != scripts[:-1]) + 1
+    starts = letters[changes].tolist()
+    return [(0, int(scripts[0]))] + list(zip(starts, scripts[changes].tolist()))
+
+
+def tag_runs(text):
+    """Split text into runs of one script each.
+
+    Common characters (spaces, digits, punctuation, dandas) stay with the
+    run before them, so joining the runs' text gives back text.
+    """
+    if not text:
+        return []
+    with telemetry.span("script_id"):
+        ids = script_ids(text)
+        if isinstance(ids, list):
+            starts = _run_starts_scalar(ids)
+        else:
+            starts = _run_starts_array(ids)
+    ends = [start for start, _ in starts[1:]] + [len(text)]
+    return [Run(SCRIPTS[script], start, end, text[start:end])
+            for (start, script), end in zip(starts, ends)]
+
+
+def route(text, scheme="iast"):
+    """(script, text) segments for a backend.
+
+    Devanagari runs are romanized with scheme; Latin and every other
+    script go to the backend unchanged.
+    """
+    from schemes import transliterate
+
+    return [
+        (run.script, transliterate(run.text, scheme) if run.script == "devanagari" else run.text)
+        for run in tag_runs(text)
+    ]
+
+
+def prepare_text(text, scheme="iast"):
+    """text with its Devanagari runs romanized, ready to synthesize."""
+    return "".join(segment for _, segment in route(text, scheme))
+
+
+def guess_language(text):
+    """Tell Sanskrit from Hindi in Devanagari text by frequent words and marks.
+
+    A heuristic: visarga, word-final virama and particles such as इति count
+    for Sanskrit; Hindi function words and nukta letters for Hindi. Without
+    either, "devanagari" is returned; text that is not mostly Devanagari
+    returns its script name instead.
+    """
+    script = identify(text)
+    return _devanagari_language(text) if script == "devanagari" else script
+
+
+def _devanagari_language(text):
+    sanskrit = text.count(VISARGA)
+    hindi = text.count(NUKTA)
+    for word in text.split():
+        word = word.strip(WORD_PUNCTUATION)
+        if word in SANSKRIT_WORDS or word.endswith(VIRAMA):
+            sanskrit += 1
+        elif word in HINDI_WORDS:
+            hindi += 1
+    if sanskrit > hindi:
+        return "sanskrit"
+    if hindi > sanskrit:
+        return "hindi"
+    return "devanagari"
+
+
+def _batch_counts(lines):
+    """(lines, scripts) matrix of character counts, in one vectorized pass."""
+    import numpy as np
+
+    lengths = np.fromiter((len(line) for line in lines), dtype=np.int64, count=len(lines))
+    ids = _script_ids_array("".join(lines))
+    owner = np.repeat(np.arange(len(lines), dtype=np.int64), lengths)
+    counts = np.bincount(owner * len(SCRIPTS) + ids, minlength=len(lines) * len(SCRIPTS))
+    return counts.reshape(len(lines), len(SCRIPTS))
+
+
+def classify_lines(lines, batch_lines=BATCH_LINES):
+    """Yield one classification dict per line of a corpus."""
+    batch = []
+    for line in lines:
+        batch.append(line.rstrip("\r\n"))
+        if len(batch) >= batch_lines:
+            yield from _classify_batch(batch)
+            batch = []
+    if batch:
+        yield from _classify_batch(batch)
+
+
+def _classify_batch(lines):
+    counts = _batch_counts(lines)
+    counts[:, COMMON] = 0
+    letters = counts.sum(axis=1)
+    dominant = counts.argmax(axis=1)
+    for line, row, total, script in zip(lines, counts.tolist(), letters.tolist(),
+                                        dominant.tolist()):
+        script = SCRIPTS[script] if total else "common"
+        yield {
+            "text": line,
+            "script": script,
+            "language": _devanagari_language(line) if script == "devanagari" else script,
+            "letters": total,
+            "devanagari_fraction": row[DEVANAGARI] / total if total else 0.0,
+            "counts": {SCRIPTS[i]: count for i, count in enumerate(row) if count},
+        }
+
+
+def classify_corpus(path, output=None, batch_lines=BATCH_LINES):
+    """Classify every line of a UTF-8 text file; writes CSV or JSONL when output is set.
+
+    Returns the number of lines per script.
+    """
+    totals = {}
+    out = None
+    writer = None
+    if output:
+        out = open(output, "w", encoding="utf-8", newline="")
+        if not output.endswith(".jsonl"):
+            writer = csv.DictWriter(
+                out, fieldnames=["line", "script", "language", "letters", "devanagari_fraction",
+                                 "text"]
+            )
+            writer.writeheader()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for number, result in enumerate(classify_lines(f, batch_lines), start=1):
+                totals[result["script"]] = totals.get(result["script"], 0) + 1
+                result["line"] = number
+                if writer is not None:
+                    result.pop("counts")
+                    writer.writerow(result)
+                elif out is not None:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Identify the scripts in text and route Devanagari to transliteration."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    tag_parser = subparsers.add_parser("tag", help="Show the script runs of some text")
+    tag_parser.add_argument("text")
+    tag_parser.add_argument("--scheme", default="iast", help="Transliteration scheme")
+    classify_parser = subparsers.add_parser("classify", help="Classify each line of a corpus")
+    classify_parser.add_argument("corpus", help="UTF-8 text file")
+    classify_parser.add_argument("--output", help="Results file (.csv or .jsonl)")
+    classify_parser.add_argument("--batch-lines", type=int, default=BATCH_LINES,
+                                 help="Lines per vectorized pass")
+    args = parser.parse_args(argv)
+
+    if args.command == "tag":
+        for run in tag_runs(args.text):
+            print(json.dumps({"script": run.script, "start": run.start, "end": run.end,
+                              "text": run.text}, ensure_ascii=False))
+        print(f"Language: {guess_language(args.text)}")
+        print(f"Backend text: {prepare_text(args.text, args.scheme)}")
+        return
+
+    start = time.perf_counter()
+    totals = classify_corpus(args.corpus, args.output, args.batch_lines)
+    elapsed = time.perf_counter() - start
+    lines = sum(totals.values())
+    for script, count in sorted(totals.items(), key=lambda item: -item[1]):
+        print(f"{script}: {count}")
+    print(f"Classified {lines} lines in {elapsed:.2f} s ({lines / elapsed:.0f} lines/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import contextlib
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: index merges still happen, just without the lock around them.
+    fcntl = None
+
+# Root directory for compiled schemes, synthesized audio and other caches.
+CACHE_DIR = os.environ.get(
+    "SANSKRIT_TTS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sanskrit_tts"),
+)
+
+
+def cache_path(*parts):
+    """Return a path under the cache directory, creating its parent when possible.
+
+    An unwritable cache is not an error here; callers that write to the
+    path handle the OSError and carry on without the cache.
+    """
+    path = os.path.join(CACHE_DIR, *parts)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    except OSError:
+        pass
+    return path
+
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """Hold a lock on path + ".lock" across processes.
+
+    Shared holders run together; an exclusive holder waits for all of them.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
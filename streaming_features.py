@@ -0,0 +1,136 @@
+import numpy as np
+
+import telemetry
+
+# Samples read from disk per block; with the frame overlap this bounds memory.
+# A multiple of the 1152-sample MP3 frame, so block reads of MP3 files decode
+# to exactly the samples of one full read.
+BLOCK_SIZE = 1152 * 64
+
+
+def source_rate(source, sr=None):
+    """Sample rate of source: a file's native rate, or sr for an array."""
+    if isinstance(source, str):
+        import soundfile
+
+        try:
+            return soundfile.info(source).samplerate
+        except soundfile.LibsndfileError:
+            import librosa
+
+            return librosa.get_samplerate(source)
+    if sr is None:
+        raise ValueError("sr is required when the source is an array")
+    return sr
+
+
+def iter_audio_blocks(source, block_size=BLOCK_SIZE):
+    """Yield float32 mono blocks of a file (at its native rate) or of a 1-D array.
+
+    Channels are averaged the way librosa.load does, so the concatenated
+    blocks equal librosa.load(path, sr=None)[0].
+    """
+    if not isinstance(source, str):
+        for start in range(0, len(source), block_size):
+            yield np.asarray(source[start:start + block_size], dtype=np.float32)
+        return
+
+    import soundfile
+
+    try:
+        f = soundfile.SoundFile(source)
+    except soundfile.LibsndfileError:
+        # Formats libsndfile cannot read fall back to a full decode, as in
+        # librosa.load.
+        import librosa
+
+        yield from iter_audio_blocks(librosa.load(source, sr=None)[0], block_size)
+        return
+    with f:
+        for block in f.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            yield block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+
+
+def iter_frames(source, n_fft=2048, hop_length=512, block_frames=256, block_size=BLOCK_SIZE):
+    """Yield contiguous sample runs holding whole STFT frames of source.
+
+    Each run spans up to block_frames frames and carries the n_fft - hop
+    overlap from the previous run, with n_fft // 2 zeros around the signal
+    as librosa's centered STFT pads it. Running an uncentered STFT over the
+    runs reproduces the centered STFT of the whole signal frame for frame.
+    """
+    pad = np.zeros(n_fft // 2, dtype=np.float32)
+    buffer = pad
+    for block in iter_audio_blocks(source, block_size):
+        buffer = np.concatenate((buffer, block))
+        while len(buffer) >= n_fft + (block_frames - 1) * hop_length:
+            run = n_fft + (block_frames - 1) * hop_length
+            yield buffer[:run]
+            buffer = buffer[block_frames * hop_length:]
+    buffer = np.concatenate((buffer, pad))
+    while len(buffer) >= n_fft:
+        frames = min(block_frames, 1 + (len(buffer) - n_fft) // hop_length)
+        yield buffer[:n_fft + (frames - 1) * hop_length]
+        buffer = buffer[frames * hop_length:]
+
+
+def iter_mel_db(source, sr=None, n_fft=2048, hop_length=512, n_mels=128, fmax=None,
+                block_frames=256):
+    """Yield (n_mels, frames) blocks of power_to_db(melspectrogram) with top_db=None."""
+    import librosa
+
+    rate = source_rate(source, sr)
+    mel_basis = librosa.filters.mel(sr=rate, n_fft=n_fft, n_mels=n_mels, fmax=fmax)
+    for run in iter_frames(source, n_fft, hop_length, block_frames):
+        stft = librosa.stft(run, n_fft=n_fft, hop_length=hop_length, center=False)
+        spectrum = np.abs(stft) ** 2
+        # Same contraction librosa.feature.melspectrogram uses.
+        mel = np.einsum("...ft,mf->...mt", spectrum, mel_basis, optimize=True)
+        yield librosa.power_to_db(mel, top_db=None)
+
+
+def stream_mfcc(source, sr=None, n_mfcc=13, n_fft=2048, hop_length=512, n_mels=128,
+                top_db=80.0, block_frames=256):
+    """Yield MFCC blocks of source, matching librosa.feature.mfcc frame for frame.
+
+    librosa floors the log-mel spectrogram at top_db below its global peak,
+    so with top_db set the source is read twice: once for the peak, then for
+    the coefficients. With top_db=None blocks are yielded in a single pass.
+    Memory stays bounded by block_frames either way. Very small blocks can
+    differ from librosa in the last bit, because BLAS picks its kernel by
+    matrix width.
+    """
+    import scipy.fft
+
+    options = dict(sr=sr, n_fft=n_fft, hop_length=hop_length, n_mels=n_mels,
+                   block_frames=block_frames)
+    floor = None
+    if top_db is not None:
+        peak = max((float(block.max()) for block in iter_mel_db(source, **options)),
+                   default=0.0)
+        floor = peak - top_db
+    for block in iter_mel_db(source, **options):
+        if floor is not None:
+            block = np.maximum(block, floor)
+        yield scipy.fft.dct(block, axis=-2, type=2, norm="ortho")[:n_mfcc]
+
+
+@telemetry.timed("mfcc")
+def mfcc(source, sr=None, n_mfcc=13, hop_length=512, block_frames=256):
+    """MFCC matrix of source and its sample rate, computed block by block."""
+    blocks = list(stream_mfcc(source, sr=sr, n_mfcc=n_mfcc, hop_length=hop_length,
+                              block_frames=block_frames))
+    rate = source_rate(source, sr)
+    if not blocks:
+        return np.zeros((n_mfcc, 0), dtype=np.float32), rate
+    return np.concatenate(blocks, axis=1), rate
+
+
+def waveform_difference(source1, source2, block_size=BLOCK_SIZE):
+    """Sum of absolute sample differences over the shorter of two sources."""
+    total = 0.0
+    for block1, block2 in zip(iter_audio_blocks(source1, block_size),
+                              iter_audio_blocks(source2, block_size)):
+        length = min(len(block1), len(block2))
+        total += float(np.sum(np.abs(block1[:length] - block2[:length]), dtype=np.float64))
+    return total
@@ -0,0 +1,69 @@
+import io
+
+import telemetry
+from chunked_synthesis import (
+    DEFAULT_PAUSE_MS,
+    DEFAULT_WORKERS,
+    iter_synthesized_chunks,
+    split_verses,
+)
+
+MIXER_FREQUENCY = 24000
+
+
+def _to_sound(data, fmt, frequency, channels, lead_in_ms=0):
+    import pygame
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(io.BytesIO(data), format=fmt)
+    if lead_in_ms:
+        segment = AudioSegment.silent(duration=lead_in_ms) + segment
+    segment = segment.set_frame_rate(frequency).set_channels(channels).set_sample_width(2)
+    return pygame.mixer.Sound(buffer=segment.raw_data)
+
+
+def play_stream(pieces, fmt="mp3", pause_ms=DEFAULT_PAUSE_MS, on_first_audio=None):
+    """Play encoded audio pieces as they arrive, queueing each behind the last.
+
+    Returns the pieces so the caller can still stitch and save the passage.
+    """
+    import pygame
+
+    # Ends when the first piece starts playing, so it covers its synthesis.
+    first_audio = telemetry.span("playback_start")
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=1)
+    frequency, _, channels = pygame.mixer.get_init()
+    clock = pygame.time.Clock()
+    channel = None
+    played = []
+    try:
+        for data in pieces:
+            sound = _to_sound(data, fmt, frequency, channels, pause_ms if played else 0)
+            if channel is None:
+                channel = sound.play()
+                first_audio.end()
+                if on_first_audio is not None:
+                    on_first_audio()
+            else:
+                # A channel holds one queued sound; wait for the slot to free up.
+                while channel.get_queue() is not None:
+                    clock.tick(100)
+                channel.queue(sound)
+            played.append(data)
+    finally:
+        # No-op once the first piece played.
+        first_audio.end()
+    while channel is not None and channel.get_busy():
+        clock.tick(10)
+    return played
+
+
+def stream_passage(text, synthesize, fmt="mp3", pause_ms=DEFAULT_PAUSE_MS,
+                   max_workers=DEFAULT_WORKERS, cache=None, on_first_audio=None, **key_fields):
+    """Synthesize a passage verse by verse and start playback on the first verse."""
+    chunks = split_verses(text) or [text]
+    pieces = iter_synthesized_chunks(
+        chunks, synthesize, fmt=fmt, max_workers=max_workers, cache=cache, **key_fields
+    )
+    return play_stream(pieces, fmt=fmt, pause_ms=pause_ms, on_first_audio=on_first_audio)
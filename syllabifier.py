@@ -0,0 +1,287 @@
+import functools
+import unicodedata
+
+# numpy is only imported for long inputs, so short command-line calls start
+# without paying for it.
+
+# Character categories for the Devanagari block (U+0900-U+097F).
+OTHER = 0
+CONSONANT = 1
+VOWEL = 2
+MATRA = 3
+VIRAMA = 4
+NUKTA = 5
+MODIFIER = 6
+
+BLOCK_START = 0x0900
+BLOCK_SIZE = 0x80
+
+VIRAMA_CHAR = "्"
+INHERENT_VOWEL = "अ"
+
+# Dependent vowel signs and the independent vowels they stand for.
+MATRA_VOWELS = {
+    "ा": "आ", "ि": "इ", "ी": "ई", "ु": "उ", "ू": "ऊ", "ृ": "ऋ", "ॄ": "ॠ",
+    "ॢ": "ऌ", "ॣ": "ॡ", "े": "ए", "ै": "ऐ", "ो": "ओ", "ौ": "औ",
+    "ॅ": "ऍ", "ॆ": "ऎ", "ॉ": "ऑ", "ॊ": "ऒ",
+}
+
+# IAST readings used for anything a scheme table leaves out.
+DEFAULT_ROMAN = {
+    "अ": "a", "आ": "ā", "इ": "i", "ई": "ī", "उ": "u", "ऊ": "ū", "ऋ": "ṛ", "ॠ": "ṝ",
+    "ऌ": "ḷ", "ॡ": "ḹ", "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+    "ऍ": "æ", "ऎ": "ĕ", "ऑ": "ô", "ऒ": "ŏ",
+    "ँ": "m̐", "ं": "ṃ", "ः": "ḥ", "ऽ": "'", "ॐ": "oṃ",
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "ṅ", "च": "c", "छ": "ch",
+    "ज": "j", "झ": "jh", "ञ": "ñ", "ट": "ṭ", "ठ": "ṭh", "ड": "ḍ", "ढ": "ḍh",
+    "ण": "ṇ", "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n", "प": "p",
+    "फ": "ph", "ब": "b", "भ": "bh", "म": "m", "य": "y", "र": "r", "ल": "l",
+    "ळ": "ḷ", "व": "v", "श": "ś", "ष": "ṣ", "स": "s", "ह": "h",
+    # The precomposed nukta letters U+0958-U+095F, escaped because editors
+    # that normalize to NFC split them into consonant + nukta. The split
+    # forms are read the same way (see Syllabifier).
+    "\u0958": "q", "\u0959": "x", "\u095a": "ġ", "\u095b": "z", "\u095c": "ṛ",
+    "\u095d": "ṛh", "\u095e": "f", "\u095f": "ẏ",
+}
+
+
+# Below this many characters romanize() uses plain Python, which for short
+# text is faster than the vectorized path and needs no numpy import.
+SCALAR_LIMIT = 512
+
+
+def _build_categories():
+    categories = bytearray(BLOCK_SIZE)
+
+    def mark(first, last, category):
+        categories[first - BLOCK_START:last - BLOCK_START + 1] = bytes([category]) * (
+            last - first + 1
+        )
+
+    mark(0x0900, 0x0903, MODIFIER)
+    mark(0x0904, 0x0914, VOWEL)
+    mark(0x0915, 0x0939, CONSONANT)
+    mark(0x093A, 0x093B, MATRA)
+    mark(0x093C, 0x093C, NUKTA)
+    mark(0x093E, 0x094C, MATRA)
+    mark(0x094D, 0x094D, VIRAMA)
+    mark(0x094E, 0x094F, MATRA)
+    mark(0x0955, 0x0957, MATRA)
+    mark(0x0958, 0x095F, CONSONANT)
+    mark(0x0960, 0x0961, VOWEL)
+    mark(0x0962, 0x0963, MATRA)
+    mark(0x0972, 0x0977, VOWEL)
+    mark(0x0978, 0x097F, CONSONANT)
+    return bytes(categories)
+
+
+CATEGORIES = _build_categories()
+
+
+def category(char):
+    """Category of a single character."""
+    offset = ord(char) - BLOCK_START
+    return CATEGORIES[offset] if 0 <= offset < BLOCK_SIZE else OTHER
+
+
+@functools.lru_cache(maxsize=None)
+def _category_array():
+    import numpy as np
+
+    return np.frombuffer(CATEGORIES, dtype=np.uint8)
+
+
+def _codepoints(text):
+    import numpy as np
+
+    return np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+
+def _categories(codepoints):
+    import numpy as np
+
+    in_block = (codepoints >= BLOCK_START) & (codepoints < BLOCK_START + BLOCK_SIZE)
+    index = np.where(in_block, codepoints - BLOCK_START, 0)
+    return np.where(in_block, _category_array()[index], OTHER), in_block, index
+
+
+def _shift_left(values, fill):
+    import numpy as np
+
+    shifted = np.empty_like(values)
+    shifted[:-1] = values[1:]
+    shifted[-1:] = fill
+    return shifted
+
+
+def _shift_right(values, fill):
+    import numpy as np
+
+    shifted = np.empty_like(values)
+    shifted[1:] = values[:-1]
+    shifted[:1] = fill
+    return shifted
+
+
+def akshara_starts(text):
+    """Return the indices at which each akshara of text begins."""
+    import numpy as np
+
+    if not text:
+        return np.zeros(0, dtype=np.intp)
+    categories, _, _ = _categories(_codepoints(text))
+    previous = _shift_right(categories, OTHER)
+    starts = (categories == CONSONANT) | (categories == VOWEL) | (categories == OTHER)
+    # A consonant after a virama continues the cluster instead of starting one.
+    starts &= ~((categories == CONSONANT) & (previous == VIRAMA))
+    starts[0] = True
+    return np.flatnonzero(starts)
+
+
+def segment(text):
+    """Split text into aksharas (orthographic syllables)."""
+    starts = akshara_starts(text).tolist()
+    ends = starts[1:] + [len(text)]
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+def inherent_vowel_mask(categories):
+    """Flag the positions after which the inherent vowel is pronounced."""
+    following = _shift_left(categories, OTHER)
+    previous = _shift_right(categories, OTHER)
+    suppressed = (following == MATRA) | (following == VIRAMA)
+    bare_consonant = (categories == CONSONANT) & ~suppressed & (following != NUKTA)
+    nukta_consonant = (categories == NUKTA) & (previous == CONSONANT) & ~suppressed
+    return bare_consonant | nukta_consonant
+
+
+def _is_devanagari(key):
+    return any(BLOCK_START <= ord(char) < BLOCK_START + BLOCK_SIZE for char in key)
+
+
+class Syllabifier:
+    """Akshara-aware romanizer built from a Devanagari to Latin scheme table."""
+
+    def __init__(self, mapping):
+        if mapping and not any(_is_devanagari(key) for key in mapping):
+            # Tables such as IAST map Latin to Devanagari; read them backwards.
+            mapping = {value: key for key, value in mapping.items()}
+
+        def roman(char):
+            return mapping.get(char, DEFAULT_ROMAN.get(char, char))
+
+        self.inherent = roman(INHERENT_VOWEL)
+        table = []
+        for offset in range(BLOCK_SIZE):
+            char = chr(BLOCK_START + offset)
+            kind = CATEGORIES[offset]
+            if kind == CONSONANT:
+                table.append(self._strip_inherent(roman(char)))
+            elif kind == MATRA:
+                table.append(roman(MATRA_VOWELS[char]) if char in MATRA_VOWELS else "")
+            elif kind in (VIRAMA, NUKTA):
+                table.append("")
+            else:
+                table.append(roman(char))
+        self.table = table
+
+        # Conjuncts with their own reading, e.g. 'ज्ञ'.
+        self.conjuncts = []
+        for key, value in mapping.items():
+            if len(key) > 1 and VIRAMA_CHAR in key and key[-1] != VIRAMA_CHAR:
+                self.conjuncts.append((key, self._strip_inherent(value)))
+        # A consonant followed by a nukta reads as its precomposed letter, so
+        # 'क' + '़' gives "qa" like 'क़'.
+        for codepoint in range(0x0958, 0x0960):
+            decomposed = unicodedata.normalize("NFD", chr(codepoint))
+            self.conjuncts.append((decomposed, table[codepoint - BLOCK_START]))
+
+    @classmethod
+    def from_compiled(cls, inherent, table, conjuncts):
+        """Rebuild a syllabifier from the tuple returned by compiled()."""
+        self = cls.__new__(cls)
+        self.inherent = inherent
+        self.table = list(table)
+        self.conjuncts = [tuple(pair) for pair in conjuncts]
+        return self
+
+    def compiled(self):
+        """The built tables as plain data, for the scheme cache."""
+        return self.inherent, self.table, self.conjuncts
+
+    @functools.cached_property
+    def _table_array(self):
+        import numpy as np
+
+        table = np.empty(BLOCK_SIZE, dtype=object)
+        table[:] = self.table
+        return table
+
+    def _strip_inherent(self, value):
+        if self.inherent and value.endswith(self.inherent) and len(value) > len(self.inherent):
+            return value[: -len(self.inherent)]
+        return value
+
+    def romanize(self, text):
+        """Romanize text, adding the inherent vowel only where it is spoken."""
+        if not text:
+            return ""
+        if len(text) < SCALAR_LIMIT:
+            return self._romanize_scalar(text)
+        import numpy as np
+
+        codepoints = _codepoints(text)
+        categories, in_block, index = _categories(codepoints)
+        pieces = np.array(list(text), dtype=object)
+        pieces[in_block] = self._table_array[index[in_block]]
+
+        length = len(codepoints)
+        for conjunct, value in self.conjuncts:
+            width = len(conjunct)
+            if width > length:
+                continue
+            match = np.ones(length - width + 1, dtype=bool)
+            for offset, char in enumerate(conjunct):
+                match &= codepoints[offset:length - width + 1 + offset] == ord(char)
+            positions = np.flatnonzero(match)
+            if positions.size:
+                pieces[positions] = value
+                for offset in range(1, width):
+                    pieces[positions + offset] = ""
+
+        schwa = inherent_vowel_mask(categories)
+        pieces[schwa] = pieces[schwa] + self.inherent
+        return "".join(pieces.tolist())
+
+    def _romanize_scalar(self, text):
+        """Same result as the vectorized path, one character at a time."""
+        table = self.table
+        categories = [category(char) for char in text]
+        pieces = [
+            table[ord(char) - BLOCK_START] if 0 <= ord(char) - BLOCK_START < BLOCK_SIZE else char
+            for char in text
+        ]
+        for conjunct, value in self.conjuncts:
+            positions = []
+            position = text.find(conjunct)
+            while position != -1:
+                positions.append(position)
+                position = text.find(conjunct, position + 1)
+            for position in positions:
+                pieces[position] = value
+            for offset in range(1, len(conjunct)):
+                for position in positions:
+                    pieces[position + offset] = ""
+
+        last = len(text) - 1
+        for position, kind in enumerate(categories):
+            following = categories[position + 1] if position < last else OTHER
+            if following in (MATRA, VIRAMA):
+                continue
+            if kind == CONSONANT and following != NUKTA:
+                pieces[position] += self.inherent
+            elif kind == NUKTA and position and categories[position - 1] == CONSONANT:
+                pieces[position] += self.inherent
+        return "".join(pieces)
+
+    __call__ = romanize
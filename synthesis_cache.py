@@ -0,0 +1,226 @@
+import atexit
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+import warnings
+
+import telemetry
+from index_journal import IndexJournal
+from settings import cache_path
+
+DEFAULT_MAX_BYTES = int(os.environ.get("SANSKRIT_TTS_AUDIO_CACHE_MB", "512")) * 1024 * 1024
+# Eviction goes below the bound by this fraction, so it runs once per batch
+# of puts rather than on every put once the cache is full.
+EVICT_TO = 0.9
+
+
+def normalize_text(text):
+    """Normalize text so equivalent inputs share a cache entry."""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(text, scheme="", backend="", voice="", rate="", lang=""):
+    """Hash the transliterated text together with every synthesis setting."""
+    fields = [normalize_text(text), scheme, backend, voice, str(rate), lang]
+    return hashlib.sha256("\x1f".join(fields).encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SynthesisCache:
+    """Size-bounded LRU cache of synthesized audio stored on disk.
+
+    The index is shared by every process using the directory: each change
+    is appended to its journal and flush() compacts it into index.json.
+    When the directory cannot be written the cache turns itself off: every
+    lookup misses and puts are dropped.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.path.dirname(cache_path("audio", "index.json"))
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(self.directory, "index.json")
+        self._journal = IndexJournal(self.index_file)
+        self._lock = threading.Lock()
+        # Access times from cache hits, written out by flush().
+        self._touched = {}
+        self._index, self._total = {}, 0
+        self.enabled = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._reload()
+        except OSError as exc:
+            self._disable(exc)
+
+    def _disable(self, exc):
+        self.enabled = False
+        self._index, self._total = {}, 0
+        self._touched.clear()
+        warnings.warn(f"audio cache disabled, {self.directory} is not writable: {exc}",
+                      RuntimeWarning, stacklevel=3)
+
+    def _reload(self):
+        self._index, self._total = {}, 0
+        snapshot, records = self._journal.load()
+        self._replay([{"op": "put", "key": key, "entry": entry} for key, entry in snapshot.items()])
+        self._replay(records)
+
+    def _replay(self, records):
+        for record in records:
+            key = record["key"]
+            current = self._index.get(key)
+            if record["op"] == "touch":
+                if current is not None:
+                    current["last_access"] = max(current["last_access"], record["last_access"])
+                continue
+            if current is not None:
+                self._total -= current["size"]
+                del self._index[key]
+            if record["op"] == "put":
+                self._index[key] = dict(record["entry"])
+                self._total += record["entry"]["size"]
+
+    def _sync(self):
+        """Pick up entries other processes recorded since the last sync."""
+        records = self._journal.read_new()
+        if records is None:
+            self._reload()
+            self._replay([{"op": "touch", "key": key, "last_access": last_access}
+                          for key, last_access in self._touched.items()])
+        else:
+            self._replay(records)
+
+    def _record(self, records):
+        self._replay(records)
+        if self._journal.append(records):
+            self._compact()
+
+    def _compact(self):
+        def fold(snapshot, records):
+            self._index, self._total = {}, 0
+            self._replay([{"op": "put", "key": key, "entry": entry}
+                          for key, entry in snapshot.items()])
+            self._replay(records)
+            self._replay([{"op": "touch", "key": key, "last_access": last_access}
+                          for key, last_access in self._touched.items()])
+            return self._index
+
+        self._journal.compact(fold)
+        self._touched.clear()
+
+    def _audio_file(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def get(self, key):
+        """Return the cached audio path for key, or None on a miss."""
+        with telemetry.span("cache_lookup", cache="audio"), self._lock:
+            path = None
+            try:
+                if self.enabled and key not in self._index:
+                    self._sync()
+                entry = self._index.get(key)
+                path = None if entry is None else self._audio_file(key, entry["ext"])
+                if path is not None and not os.path.exists(path):
+                    path = None
+                    self._record([{"op": "remove", "key": key}])
+            except OSError as exc:
+                self._disable(exc)
+            telemetry.record_cache("audio", path is not None)
+            if path is not None:
+                entry["last_access"] = self._touched[key] = time.time()
+            return path
+
+    def get_bytes(self, key):
+        """Return the cached audio bytes for key, or None on a miss."""
+        path = self.get(key)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def put(self, key, data, ext="mp3"):
+        """Store audio bytes under key and evict old entries past the size bound.
+
+        Returns the cached path, or None when the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        path = self._audio_file(key, ext)
+        try:
+            _atomic_write(path, data)
+        except OSError as exc:
+            with self._lock:
+                self._disable(exc)
+            return None
+        telemetry.record_write("cache", len(data))
+        with self._lock:
+            try:
+                self._sync()
+                entry = {"ext": ext, "size": len(data), "last_access": time.time()}
+                self._record([{"op": "put", "key": key, "entry": entry}])
+                if self._total > self.max_bytes:
+                    self._record(self._evict())
+            except OSError as exc:
+                self._disable(exc)
+                return None
+        return path
+
+    def _evict(self):
+        """Remove least recently used entries down to EVICT_TO of the bound."""
+        target = self.max_bytes * EVICT_TO
+        total = self._total
+        removed = []
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_access"]):
+            if total <= target:
+                break
+            entry = self._index[key]
+            try:
+                os.remove(self._audio_file(key, entry["ext"]))
+            except OSError:
+                pass
+            total -= entry["size"]
+            removed.append({"op": "remove", "key": key})
+        return removed
+
+    def flush(self):
+        """Persist access times recorded by cache hits and compact the journal."""
+        with self._lock:
+            if self.enabled and (self._touched or self._journal.pending()):
+                try:
+                    self._compact()
+                except OSError as exc:
+                    self._disable(exc)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    """Return the process-wide cache under the shared cache directory."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SynthesisCache()
+            atexit.register(_default_cache.flush)
+    return _default_cache
+
+
+def cached_synthesis_bytes(key, synthesize, ext="mp3", cache=None):
+    """Return audio bytes for key, calling synthesize() only on a miss."""
+    cache = cache or default_cache()
+    data = cache.get_bytes(key)
+    if data is None:
+        data = synthesize()
+        if data:
+            cache.put(key, data, ext)
+    return data
@@ -0,0 +1,351 @@
+import bisect
+import functools
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+# Spans, counters and histograms for every pipeline stage. Recording is a
+# few microseconds and needs only the standard library, so stages are
+# always instrumented; sinks decide where span records go.
+#
+# Metric names and label values should stay low-cardinality (stage, scheme,
+# backend, cache), never per-file or per-text.
+
+PREFIX = "sanskrit_tts_"
+# Seconds; spans run from sub-millisecond lookups to multi-second synthesis.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_sinks = []
+_span_ids = itertools.count(1)
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative bucket counts plus count, sum, min and max of observations."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) pairs, ending with +Inf."""
+        return list(zip(self.buckets + (float("inf"),), itertools.accumulate(self.counts)))
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name, value=1, **labels):
+    """Add value to the counter name{labels}."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record value in the histogram name{labels}."""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+class Span:
+    """A timed stage, measured on the monotonic perf_counter clock.
+
+    Ending a span records its duration in stage_seconds{stage=name, ...},
+    counts stage_errors_total when it ended with an exception, and hands a
+    record to every sink. Spans started inside another on the same thread
+    record it as their parent.
+    """
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.id = next(_span_ids)
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.duration = None
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+
+    def end(self, error=None):
+        """Record the span once; later calls return the first duration."""
+        if self.duration is not None:
+            return self.duration
+        duration = self.duration = time.perf_counter() - self.start
+        # Ending a span on another thread leaves that thread's stack alone.
+        stack = getattr(_local, "stack", [])
+        if self in stack:
+            stack.remove(self)
+        observe("stage_seconds", duration, stage=self.name, **self.labels)
+        if error is not None:
+            increment("stage_errors_total", stage=self.name, **self.labels)
+        if _sinks:
+            record = {
+                "type": "span",
+                "name": self.name,
+                "labels": self.labels,
+                "id": self.id,
+                "parent": self.parent,
+                "thread": threading.current_thread().name,
+                "pid": os.getpid(),
+                "time": self.wall_start,
+                "duration": duration,
+            }
+            if error is not None:
+                record["error"] = type(error).__name__
+            for sink in list(_sinks):
+                sink.emit(record)
+        return duration
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end(exc)
+        return False
+
+
+def span(name, **labels):
+    """Start a span; use it as a context manager or call end() on it."""
+    return Span(name, labels)
+
+
+def timed(name, **labels):
+    """Decorator running each call of a function inside span(name, **labels)."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with Span(name, labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache, hit):
+    """Count one lookup in cache as a hit or a miss."""
+    increment("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def record_write(kind, size):
+    """Count size bytes written to disk for kind (audio, cache, features)."""
+    increment("bytes_written_total", size, kind=kind)
+
+
+class JsonLogSink:
+    """Appends one JSON line per span to a file or stream.
+
+    Each line goes out in a single write to a file opened for appending,
+    so worker processes can share one log.
+    """
+
+    def __init__(self, target=sys.stderr):
+        self._owned = isinstance(target, str)
+        self.stream = open(target, "a", encoding="utf-8") if self._owned else target
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+
+
+def add_sink(sink):
+    """Send span records to sink.emit(record) from now on."""
+    with _lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def reset():
+    """Drop every recorded counter and histogram."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def snapshot():
+    """Current counters, histograms and cache hit ratios as plain data."""
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "mean": histogram.sum / histogram.count if histogram.count else None,
+                "min": histogram.min,
+                "max": histogram.max,
+                "buckets": [[bound if bound != float("inf") else "+Inf", count]
+                            for bound, count in histogram.cumulative()],
+            }
+            for (name, labels), histogram in sorted(_histograms.items())
+        ]
+    lookups = {}
+    for counter in counters:
+        if counter["name"] == "cache_requests_total":
+            hits_total = lookups.setdefault(counter["labels"]["cache"], [0, 0])
+            hits_total[0] += counter["value"] if counter["labels"]["result"] == "hit" else 0
+            hits_total[1] += counter["value"]
+    return {
+        "counters": counters,
+        "histograms": histograms,
+        "cache_hit_ratio": {cache: hits / total for cache, (hits, total) in lookups.items()},
+    }
+
+
+def merge(other):
+    """Add the counters and histograms of another process's snapshot() to ours."""
+    with _lock:
+        for counter in other["counters"]:
+            key = _key(counter["name"], counter["labels"])
+            _counters[key] = _counters.get(key, 0) + counter["value"]
+        for data in other["histograms"]:
+            key = _key(data["name"], data["labels"])
+            histogram = _histograms.get(key)
+            if histogram is None:
+                bounds = tuple(bound for bound, _ in data["buckets"][:-1])
+                histogram = _histograms[key] = Histogram(bounds)
+            previous = 0
+            for i, (_, cumulative) in enumerate(data["buckets"]):
+                histogram.counts[i] += cumulative - previous
+                previous = cumulative
+            histogram.count += data["count"]
+            histogram.sum += data["sum"]
+            for attribute, pick in (("min", min), ("max", max)):
+                value = data[attribute]
+                if value is not None:
+                    current = getattr(histogram, attribute)
+                    setattr(histogram, attribute, value if current is None else pick(current, value))
+
+
+def stage_summary():
+    """Calls and total seconds per stage, one line each, for printing after a run."""
+    stages = {}
+    with _lock:
+        for (name, labels), histogram in _histograms.items():
+            if name == "stage_seconds":
+                calls_total = stages.setdefault(dict(labels)["stage"], [0, 0.0])
+                calls_total[0] += histogram.count
+                calls_total[1] += histogram.sum
+    return "\n".join(
+        f"{stage:<16} {calls:>5} x {total:9.3f} s"
+        for stage, (calls, total) in sorted(stages.items(), key=lambda item: -item[1][1])
+    )
+
+
+def _prometheus_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def prometheus_text():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(
+            (key, histogram.cumulative(), histogram.count, histogram.sum)
+            for key, histogram in _histograms.items()
+        )
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            typed.add(name)
+        lines.append(f"{PREFIX}{name}{_prometheus_labels(labels)} {value}")
+    for (name, labels), cumulative, count, total in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            typed.add(name)
+        for bound, bucket_count in cumulative:
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{PREFIX}{name}_bucket{_prometheus_labels(labels, [('le', le)])} "
+                         f"{bucket_count}")
+        lines.append(f"{PREFIX}{name}_sum{_prometheus_labels(labels)} {total}")
+        lines.append(f"{PREFIX}{name}_count{_prometheus_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """Serve prometheus_text() at /metrics from a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# SANSKRIT_TTS_TRACE_LOG names a file that every process appends span records to.
+if os.environ.get("SANSKRIT_TTS_TRACE_LOG"):
+    add_sink(JsonLogSink(os.environ["SANSKRIT_TTS_TRACE_LOG"]))
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+import analysis_audio
+import feature_cache
+
+librosa = pytest.importorskip("librosa")
+soundfile = pytest.importorskip("soundfile")
+
+
+def test_streamed_pcm_matches_librosa_load(tmp_path, monkeypatch):
+    (tmp_path / "features").mkdir()
+    monkeypatch.setattr(feature_cache, "FEATURE_DIR", str(tmp_path / "features"))
+    monkeypatch.setattr(feature_cache, "INDEX_FILE", str(tmp_path / "features" / "index.json"))
+    monkeypatch.setattr(feature_cache, "_index", None)
+    rng = np.random.default_rng(0)
+    # Several read blocks long, stereo, at a rate that needs resampling.
+    path = str(tmp_path / "take.wav")
+    soundfile.write(path, rng.uniform(-0.5, 0.5, (3 * 44100, 2)).astype(np.float32), 44100)
+
+    for sr in (analysis_audio.ANALYSIS_RATE, None):
+        samples, rate = analysis_audio.load_pcm(path, sr=sr, res_type="soxr_hq")
+        expected, expected_rate = librosa.load(path, sr=sr, mono=True, res_type="soxr_hq")
+        assert rate == expected_rate
+        assert samples.shape == expected.shape
+        np.testing.assert_allclose(samples, expected, atol=1e-6)
@@ -0,0 +1,52 @@
+import base64
+import io
+
+import pytest
+
+gtts = pytest.importorskip("gtts")
+requests = pytest.importorskip("requests")
+
+from backends import GTTSBackend, _gtts_internals_supported  # noqa: E402
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+
+    def __init__(self, request):
+        self.request = request
+        # One audio part per request, numbered so their order shows.
+        self.part = f"part-{FakeResponse.sent}".encode("ascii")
+        FakeResponse.sent += 1
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, chunk_size=1024):
+        payload = base64.b64encode(self.part).decode("ascii")
+        yield b")]}'"
+        yield f'[["wrb.fr","jQ1olc","[\\"{payload}\\"]",null]]'.encode("utf-8")
+
+
+@pytest.mark.skipif(not _gtts_internals_supported(), reason="unsupported gTTS release")
+def test_session_reuse_writes_what_gtts_stream_writes(monkeypatch):
+    sessions = []
+
+    def send(session, request, **kwargs):
+        sessions.append(session)
+        return FakeResponse(request)
+
+    monkeypatch.setattr(requests.Session, "send", send)
+    # Long enough for gTTS to split it into several requests.
+    text = "namaste " * 40
+
+    FakeResponse.sent = 0
+    expected = io.BytesIO()
+    gtts.gTTS(text=text, lang="hi").write_to_fp(expected)
+    assert FakeResponse.sent > 1
+
+    FakeResponse.sent = 0
+    sessions.clear()
+    backend = GTTSBackend(lang="hi")
+    assert backend.synthesize(text) == expected.getvalue()
+    assert len(set(map(id, sessions))) == 1
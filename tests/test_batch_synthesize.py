@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from batch_synthesize import read_corpus
+
+
+def write_corpus(tmp_path, records):
+    path = tmp_path / "corpus.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    return str(path)
+
+
+def test_ids_default_to_line_numbers_and_allow_any_script(tmp_path):
+    path = write_corpus(tmp_path, [{"text": "नमः"}, {"id": "गीता-2.47", "text": "कर्मण्येव"}])
+    assert list(read_corpus(path)) == [("1", "नमः"), ("गीता-2.47", "कर्मण्येव")]
+
+
+@pytest.mark.parametrize("item_id", ["../x", "a/b", "..", ".hidden", "-x", ""])
+def test_unsafe_ids_are_rejected(tmp_path, item_id):
+    path = write_corpus(tmp_path, [{"id": item_id, "text": "नमः"}])
+    with pytest.raises(ValueError, match="safe file name"):
+        list(read_corpus(path))
+
+
+def test_duplicate_ids_are_rejected(tmp_path):
+    path = write_corpus(tmp_path, [{"id": "v1", "text": "नमः"}, {"id": "v1", "text": "ॐ"}])
+    with pytest.raises(ValueError, match="duplicate id 'v1'"):
+        list(read_corpus(path))
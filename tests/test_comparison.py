@@ -0,0 +1,38 @@
+import pytest
+
+import feature_cache
+
+pytest.importorskip("librosa")
+pytest.importorskip("pydub")
+soundfile = pytest.importorskip("soundfile")
+
+import comparison  # noqa: E402
+from backends import OfflineBackend  # noqa: E402
+
+
+def test_in_memory_sources_match_files(tmp_path, monkeypatch):
+    (tmp_path / "features").mkdir()
+    monkeypatch.setattr(feature_cache, "FEATURE_DIR", str(tmp_path / "features"))
+    monkeypatch.setattr(feature_cache, "INDEX_FILE", str(tmp_path / "features" / "index.json"))
+    monkeypatch.setattr(feature_cache, "_index", None)
+    backend = OfflineBackend(sample_rate=22050)
+    data1, data2 = backend.synthesize("namaste"), backend.synthesize("namah shivaya")
+    path1, path2 = tmp_path / "a.wav", tmp_path / "b.wav"
+    path1.write_bytes(data1)
+    path2.write_bytes(data2)
+    metrics = ("hash", "waveform", "dtw", "alignment")
+
+    from_files = comparison.compare(str(path1), str(path2), metrics=metrics)
+    from_bytes = comparison.compare(data1, data2, metrics=metrics, fmt="wav")
+    samples, rate = soundfile.read(str(path2), dtype="float32")
+    mixed = comparison.compare(str(path1), (samples, rate), metrics=metrics[1:])
+
+    assert from_bytes.hash1 == from_files.hash1
+    assert from_bytes.file1 == f"<{len(data1)} bytes>"
+    for report in (from_bytes, mixed):
+        assert report.sample_rate1 == report.sample_rate2 == from_files.sample_rate1
+        assert report.waveform_difference == pytest.approx(from_files.waveform_difference,
+                                                           rel=1e-4)
+        assert report.dtw_distance == pytest.approx(from_files.dtw_distance, rel=1e-4)
+        assert report.alignment_distance == pytest.approx(from_files.alignment_distance,
+                                                          rel=1e-4)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import dtw_engine
+
+
+def naive_dtw(x, y):
+    """Unconstrained DTW over the full cost matrix, for reference."""
+    n, m = len(x), len(y)
+    accumulated = np.full((n + 1, m + 1), np.inf)
+    accumulated[0, 0] = 0.0
+    for i in range(n):
+        for j in range(m):
+            step = min(accumulated[i, j], accumulated[i, j + 1], accumulated[i + 1, j])
+            accumulated[i + 1, j + 1] = np.linalg.norm(x[i] - y[j]) + step
+    return accumulated[n, m]
+
+
+def random_pairs(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        n, m = rng.integers(1, 30, size=2)
+        yield rng.standard_normal((n, 4)), rng.standard_normal((m, 4))
+
+
+def test_unconstrained_distance_matches_naive():
+    for x, y in random_pairs(50):
+        assert dtw_engine.dtw_distance(x, y) == pytest.approx(naive_dtw(x, y))
+
+
+def test_wide_band_equals_unconstrained():
+    for x, y in random_pairs(20, seed=1):
+        wide = max(len(x), len(y))
+        assert dtw_engine.dtw_distance(x, y, window=wide) == pytest.approx(naive_dtw(x, y))
+
+
+def test_path_cost_equals_distance():
+    for x, y in random_pairs(20, seed=2):
+        window = dtw_engine.band_radius(len(x), len(y), 0.2)
+        distance, path = dtw_engine.dtw_distance(x, y, window=window, return_path=True)
+        assert tuple(path[0]) == (0, 0) and tuple(path[-1]) == (len(x) - 1, len(y) - 1)
+        steps = np.diff(path, axis=0)
+        assert ((steps >= 0) & (steps <= 1)).all() and (steps.sum(axis=1) > 0).all()
+        cost = np.linalg.norm(x[path[:, 0]] - y[path[:, 1]], axis=1).sum()
+        assert cost == pytest.approx(distance)
+
+
+@pytest.mark.parametrize("constraint", [{"window": 3}, {"itakura_slope": 2.0}])
+def test_lb_keogh_bounds_banded_dtw(constraint):
+    for x, y in random_pairs(50, seed=3):
+        bound = dtw_engine.lb_keogh(x, y, **constraint)
+        assert bound <= dtw_engine.dtw_distance(x, y, **constraint) + 1e-9
+
+
+def test_threshold_abandons_only_above_it():
+    for x, y in random_pairs(50, seed=4):
+        distance = dtw_engine.dtw_distance(x, y, window=4)
+        assert dtw_engine.dtw_distance(x, y, window=4, threshold=distance) == pytest.approx(distance)
+        assert dtw_engine.dtw_distance(x, y, window=4, threshold=distance * 0.5) > distance * 0.5
+    x, y = np.zeros((20, 2)), np.ones((20, 2))
+    assert dtw_engine.dtw_distance(x, y, threshold=1.0) == np.inf
+    assert dtw_engine.dtw_distance(x, y, threshold=1.0, return_path=True) == (np.inf, None)
@@ -0,0 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import feature_cache
+
+
+def _hash_files(paths):
+    for path in paths:
+        feature_cache.file_digest(path)
+
+
+def test_processes_keep_each_others_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_cache, "INDEX_FILE", str(tmp_path / "index.json"))
+    monkeypatch.setattr(feature_cache, "_index", None)
+    groups = []
+    for worker in range(4):
+        paths = []
+        for i in range(10):
+            path = tmp_path / f"{worker}-{i}.wav"
+            path.write_bytes(bytes([worker, i]))
+            paths.append(str(path))
+        groups.append(paths)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_hash_files, groups))
+    monkeypatch.setattr(feature_cache, "_index", None)
+    assert len(feature_cache._load_index()["files"]) == 40
@@ -0,0 +1,10 @@
+from telemetry import percentile
+
+
+def test_nearest_rank():
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile([1, 2], 50) == 1
+    assert percentile([3, 1, 2], 100) == 3
+    assert percentile([3, 1, 2], 0) == 1
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_without_cache(tmp_path, args, **env):
+    # A regular file where the cache directory should be makes every makedirs fail.
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    env = dict(os.environ, SANSKRIT_TTS_CACHE=str(blocker / "cache"), **env)
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True,
+                          text=True)
+
+
+def test_unwritable_cache_still_transliterates(tmp_path):
+    result = run_without_cache(
+        tmp_path, ["-c", "import schemes; print(schemes.transliterate('नमः', 'iast'))"]
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "namaḥ"
+
+
+def test_unwritable_cache_still_speaks(tmp_path):
+    pytest.importorskip("numpy")
+    output = tmp_path / "out.wav"
+    result = run_without_cache(
+        tmp_path, ["sanskrit_tts.py", "speak", "नमः", "--output", str(output)],
+        SANSKRIT_TTS_BACKEND="offline",
+    )
+    assert result.returncode == 0, result.stderr
+    assert output.stat().st_size > 0
+
+
+def test_unwritable_cache_still_compares(tmp_path):
+    pytest.importorskip("librosa")
+    soundfile = pytest.importorskip("soundfile")
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    paths = []
+    for name in ("a.wav", "b.wav"):
+        path = tmp_path / name
+        soundfile.write(str(path), rng.uniform(-0.5, 0.5, 16000).astype(np.float32), 16000)
+        paths.append(str(path))
+    result = run_without_cache(tmp_path, ["sanskrit_tts.py", "compare", *paths, "--json"])
+    assert result.returncode == 0, result.stderr
+    assert "disabled" in result.stderr
@@ -0,0 +1,27 @@
+import marshal
+
+from schemes import get_syllabifier
+from syllabifier import SCALAR_LIMIT, Syllabifier
+
+
+def test_nukta_letters_precomposed_and_decomposed():
+    iast = get_syllabifier("iast")
+    assert iast.romanize("क़") == "qa"
+    assert iast.romanize("क़") == "qa"
+    assert iast.romanize("ज़मीन") == "zamīna"
+    assert iast.romanize("ज़मीन") == "zamīna"
+    assert iast.romanize("सड़क") == "saṛaka"
+
+
+def test_vectorized_path_matches_scalar():
+    iast = get_syllabifier("iast")
+    text = "क़िला फ़़ धर्मक्षेत्रे "
+    text *= SCALAR_LIMIT // len(text) + 1
+    assert iast.romanize(text) == iast._romanize_scalar(text)
+
+
+def test_compiled_tables_round_trip():
+    iast = get_syllabifier("iast")
+    rebuilt = Syllabifier.from_compiled(*marshal.loads(marshal.dumps(iast.compiled())))
+    text = "धर्मक्षेत्रे कुरुक्षेत्रे ज्ञानं क़िला"
+    assert rebuilt.romanize(text) == iast.romanize(text)
@@ -0,0 +1,38 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from synthesis_cache import SynthesisCache
+
+
+def _put_many(directory, worker):
+    cache = SynthesisCache(directory)
+    for i in range(20):
+        cache.put(f"{worker}-{i}", b"audio", "wav")
+
+
+def test_processes_keep_each_others_entries(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_put_many, [str(tmp_path)] * 4, range(4)))
+    assert len(SynthesisCache(str(tmp_path))._index) == 80
+    assert SynthesisCache(str(tmp_path)).get_bytes("3-19") == b"audio"
+
+
+def test_eviction_is_not_undone_by_merge(tmp_path):
+    cache = SynthesisCache(str(tmp_path), max_bytes=10)
+    cache.put("old", b"12345678", "wav")
+    cache.put("new", b"12345678", "wav")
+    assert cache.get("old") is None
+    assert set(SynthesisCache(str(tmp_path))._index) == {"new"}
+
+
+def test_flush_compacts_into_index_json(tmp_path):
+    cache = SynthesisCache(str(tmp_path))
+    cache.put("a", b"audio", "wav")
+    cache.put("b", b"audio", "wav")
+    assert cache.get("a")
+    cache.flush()
+    with open(tmp_path / "index.json", "r", encoding="utf-8") as f:
+        index = json.load(f)
+    assert set(index) == {"a", "b"}
+    assert index["a"]["last_access"] >= index["b"]["last_access"]
+    assert (tmp_path / "index.json.journal").stat().st_size == 0
@@ -0,0 +1,36 @@
+import threading
+
+import telemetry
+
+
+def test_merge_adds_another_snapshot():
+    telemetry.reset()
+    telemetry.increment("synthesis_total", backend="offline")
+    telemetry.observe("stage_seconds", 0.003, stage="decode")
+    other = telemetry.snapshot()
+    telemetry.observe("stage_seconds", 0.2, stage="decode")
+    telemetry.merge(other)
+    merged = telemetry.snapshot()
+    assert merged["counters"][0]["value"] == 2
+    histogram = merged["histograms"][0]
+    assert histogram["count"] == 3
+    assert histogram["min"] == 0.003 and histogram["max"] == 0.2
+    assert histogram["buckets"][-1] == ["+Inf", 3]
+    telemetry.reset()
+
+
+def test_span_ends_on_another_thread():
+    span = telemetry.span("playback_start")
+    errors = []
+
+    def end():
+        try:
+            span.end()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=end)
+    thread.start()
+    thread.join()
+    assert not errors and span.duration is not None
+    telemetry.reset()
@@ -0,0 +1,69 @@
+class Transliterator:
+    """Longest-match transliteration over a compiled trie of a mapping table."""
+
+    def __init__(self, mapping):
+        # State 0 is the root; each state has a transition dict and an
+        # optional output string when a key ends there.
+        self.transitions = [{}]
+        self.outputs = [None]
+        for key, value in mapping.items():
+            self._insert(key, value)
+
+    def _insert(self, key, value):
+        state = 0
+        for char in key:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.outputs.append(None)
+            state = next_state
+        self.outputs[state] = value
+
+    @classmethod
+    def from_compiled(cls, transitions, outputs):
+        """Rebuild a transliterator from previously compiled state tables."""
+        self = cls.__new__(cls)
+        self.transitions = transitions
+        self.outputs = outputs
+        return self
+
+    def transliterate(self, text):
+        """Transliterate text, preferring the longest key at each position."""
+        transitions = self.transitions
+        outputs = self.outputs
+        root = transitions[0]
+        pieces = []
+        append = pieces.append
+        i = 0
+        n = len(text)
+        while i < n:
+            state = root.get(text[i])
+            if state is None:
+                append(text[i])
+                i += 1
+                continue
+            match, match_end = outputs[state], i + 1
+            j = i + 1
+            while j < n:
+                state = transitions[state].get(text[j])
+                if state is None:
+                    break
+                j += 1
+                if outputs[state] is not None:
+                    match, match_end = outputs[state], j
+            if match is None:
+                append(text[i])
+                i += 1
+            else:
+                append(match)
+                i = match_end
+        return "".join(pieces)
+
+    __call__ = transliterate
+
+
+def compile_table(mapping):
+    """Compile a mapping table into a reusable Transliterator."""
+    return Transliterator(mapping)
@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+from settings import CACHE_DIR
+
+# The client half of this module only needs the standard library, so a
+# request costs an interpreter start and a socket round trip. Everything
+# heavy is imported by the daemon once and kept warm.
+
+SOCKET_PATH = os.environ.get("SANSKRIT_TTS_SOCKET", os.path.join(CACHE_DIR, "daemon.sock"))
+OPERATIONS = ("ping", "transliterate", "synthesize", "compare", "metrics", "shutdown")
+
+# Messages are one JSON header line, followed by header["size"] bytes of
+# payload (the audio of a synthesize reply, the Prometheus text of a metrics
+# reply; empty otherwise).
+
+
+class DaemonError(RuntimeError):
+    """Raised by the client when the daemon reports a failed request."""
+
+
+class Daemon:
+    """Serves transliteration, synthesis and comparison from one warm process."""
+
+    def __init__(self, backend_name="gtts", lang="hi", scheme="iast", workers=4,
+                 playback=False):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.backend_name = backend_name
+        self.lang = lang
+        self.scheme = scheme
+        self.playback = playback
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.requests = 0
+
+    def warm_up(self):
+        """Load tables, clients and caches, and compile the numba kernels once."""
+        import numpy as np
+        import librosa
+        from librosa.sequence import dtw
+
+        import comparison  # noqa: F401
+        import dtw_engine
+        import streaming_features
+        from analysis_audio import ANALYSIS_RATE
+        from backends import get_backend
+        from schemes import BUILTIN_SCHEMES, transliterate
+        from synthesis_cache import default_cache
+
+        for scheme in BUILTIN_SCHEMES:
+            transliterate("धर्मक्षेत्रे कुरुक्षेत्रे", scheme)
+        get_backend(self.backend_name, lang=self.lang)
+        default_cache()
+
+        # One second of a tone through every kernel the metrics use, so the
+        # first real request does not wait for numba.
+        t = np.arange(ANALYSIS_RATE, dtype=np.float32) / ANALYSIS_RATE
+        signal = np.sin(2 * np.pi * 220 * t).astype(np.float32)
+        librosa.feature.mfcc(y=signal, sr=ANALYSIS_RATE, n_mfcc=13)
+        frames = streaming_features.mfcc(signal, sr=ANALYSIS_RATE)[0].T
+        dtw(frames, frames)
+        dtw_engine.dtw_distance(frames, frames, window=3, return_path=True)
+
+        if self.playback:
+            import pygame
+
+            pygame.mixer.init()
+        # Metrics should describe requests, not the warm-up.
+        import telemetry
+
+        telemetry.reset()
+
+    def transliterate(self, request):
+        from schemes import transliterate
+
+        scheme = request.get("scheme") or self.scheme
+        return {"transliteration": transliterate(request["text"], scheme)}, b""
+
+    def synthesize(self, request):
+        from backends import get_backend
+        from chunked_synthesis import synthesize_passage_bytes
+        from script_id import prepare_text
+        from synthesis_cache import cache_key, default_cache
+
+        scheme = request.get("scheme") or self.scheme
+        backend = get_backend(request.get("backend") or self.backend_name,
+                              lang=request.get("lang") or self.lang)
+        english_text = prepare_text(request["text"], scheme)
+        fields = dict(scheme=scheme, **backend.cache_fields())
+        key = cache_key(english_text, **fields)
+        cache = default_cache()
+        data = cache.get_bytes(key)
+        if data is None:
+            data = synthesize_passage_bytes(english_text, backend.synthesize, fmt=backend.fmt,
+                                            **fields)
+            cache.put(key, data, backend.fmt)
+        if request.get("play"):
+            if not self.playback:
+                raise ValueError("Playback is off; start the daemon with --playback")
+            from audio_buffers import play_bytes
+
+            play_bytes(data, backend.fmt)
+        return {"transliteration": english_text, "format": backend.fmt, "key": key}, data
+
+    def compare(self, request):
+        from analysis_audio import ANALYSIS_RATE
+        from comparison import ALL_METRICS, DEFAULT_BAND, compare
+
+        report = compare(
+            request["file1"], request["file2"], metrics=request.get("metrics") or ALL_METRICS,
+            band=request.get("band", DEFAULT_BAND), threshold=request.get("threshold"),
+            sr=request.get("sr", ANALYSIS_RATE),
+        )
+        return {"report": report.to_dict()}, b""
+
+    async def handle(self, reader, writer):
+        """Answer requests on one connection until the client closes it."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.requests += 1
+                op = None
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op == "ping":
+                        header, payload = {"requests": self.requests, "pid": os.getpid()}, b""
+                    elif op == "metrics":
+                        import telemetry
+
+                        header = {"snapshot": telemetry.snapshot()}
+                        payload = telemetry.prometheus_text().encode("utf-8")
+                    elif op == "shutdown":
+                        header, payload = {}, b""
+                    elif op == "transliterate":
+                        header, payload = self.transliterate(request)
+                    elif op in ("synthesize", "compare"):
+                        header, payload = await loop.run_in_executor(
+                            self.executor, getattr(self, op), request
+                        )
+                    else:
+                        raise ValueError(f"Unknown operation {op!r}; available: "
+                                         f"{list(OPERATIONS)}")
+                    header["ok"] = True
+                # Report any failure to the client and keep serving.
+                except Exception as error:
+                    header, payload = {"ok": False,
+                                       "error": f"{type(error).__name__}: {error}"}, b""
+                header["size"] = len(payload)
+                writer.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+                writer.write(payload)
+                await writer.drain()
+                if header["ok"] and op == "shutdown":
+                    # Reply first, then stop instead of waiting on a closing server.
+                    self.stopping.set()
+                    break
+        # Connections still open at shutdown are cancelled; that is their end.
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=SOCKET_PATH):
+        import asyncio
+
+        self.stopping = asyncio.Event()
+        if os.path.exists(path):
+            try:
+                DaemonClient(path).close()
+            except OSError:
+                # Left behind by a daemon that did not shut down cleanly.
+                os.unlink(path)
+            else:
+                raise RuntimeError(f"A daemon is already listening on {path}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        server = await asyncio.start_unix_server(self.handle, path=path, limit=1 << 24)
+        os.chmod(path, 0o600)
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            async with server:
+                await self.stopping.wait()
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+            self.executor.shutdown(wait=False)
+
+
+class DaemonClient:
+    """A connection to the daemon that can carry many requests."""
+
+    def __init__(self, path=SOCKET_PATH, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, op, **fields):
+        """Send one request and return (header, payload); raises DaemonError."""
+        message = json.dumps(dict(fields, op=op), ensure_ascii=False).encode("utf-8")
+        self.sock.sendall(message + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise DaemonError("The daemon closed the connection")
+        header = json.loads(line)
+        payload = self.reader.read(header.get("size", 0))
+        if not header.get("ok"):
+            raise DaemonError(header.get("error", "Request failed"))
+        return header, payload
+
+    def transliterate(self, text, scheme=None):
+        return self.request("transliterate", text=text, scheme=scheme)[0]["transliteration"]
+
+    def synthesize(self, text, **options):
+        """Return (header, audio bytes) for text."""
+        return self.request("synthesize", text=text, **options)
+
+    def compare(self, file1, file2, **options):
+        # The daemon runs in its own working directory.
+        header, _ = self.request("compare", file1=os.path.abspath(file1),
+                                 file2=os.path.abspath(file2), **options)
+        return header["report"]
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def serve_command(args):
+    import asyncio
+
+    daemon = Daemon(backend_name=args.backend, lang=args.lang, scheme=args.scheme,
+                    workers=args.workers, playback=args.playback)
+    daemon.warm_up()
+    asyncio.run(daemon.serve(args.socket))
+
+
+def client_command(args):
+    with DaemonClient(args.socket) as client:
+        if args.command == "ping":
+            print(json.dumps(client.request("ping")[0]))
+        elif args.command == "metrics":
+            header, payload = client.request("metrics")
+            if args.json:
+                print(json.dumps(header["snapshot"], indent=2))
+            else:
+                print(payload.decode("utf-8"), end="")
+        elif args.command == "stop":
+            client.request("shutdown")
+        elif args.command == "transliterate":
+            print(client.transliterate(args.text, args.scheme))
+        elif args.command == "speak":
+            header, data = client.synthesize(args.text, scheme=args.scheme, backend=args.backend,
+                                             lang=args.lang, play=args.play)
+            if args.output or not args.play:
+                output = args.output or f"output.{header['format']}"
+                with open(output, "wb") as f:
+                    f.write(data)
+                print(output)
+        elif args.command == "compare":
+            metrics = args.metrics.split(",") if args.metrics else None
+            report = client.compare(args.file1, args.file2, metrics=metrics,
+                                    sr=args.sr or None, band=args.band)
+            print(json.dumps(report, ensure_ascii=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Keep Sanskrit TTS warm in a local daemon and send it requests."
+    )
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon in the foreground")
+    serve_parser.add_argument("--scheme", default="iast", help="Default transliteration scheme")
+    serve_parser.add_argument("--backend", default="gtts", help="Default synthesis backend")
+    serve_parser.add_argument("--lang", default="hi", help="Default backend language code")
+    serve_parser.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    serve_parser.add_argument("--playback", action="store_true",
+                              help="Initialise pygame and accept play requests")
+
+    subparsers.add_parser("ping", help="Check the daemon is up")
+    subparsers.add_parser("stop", help="Shut the daemon down")
+    metrics_parser = subparsers.add_parser("metrics", help="Show the daemon's stage metrics")
+    metrics_parser.add_argument("--json", action="store_true",
+                                help="Print the snapshot instead of Prometheus text")
+    transliterate_parser = subparsers.add_parser("transliterate", help="Romanize text")
+    transliterate_parser.add_argument("text")
+    transliterate_parser.add_argument("--scheme", help="Transliteration scheme")
+    speak_parser = subparsers.add_parser("speak", help="Synthesize text")
+    speak_parser.add_argument("text")
+    speak_parser.add_argument("--scheme", help="Transliteration scheme")
+    speak_parser.add_argument("--backend", help="Synthesis backend")
+    speak_parser.add_argument("--lang", help="Backend language code")
+    speak_parser.add_argument("--output", help="Audio file to write (default output.<fmt>)")
+    speak_parser.add_argument("--play", action="store_true", help="Play on the daemon")
+    compare_parser = subparsers.add_parser("compare", help="Score two recordings")
+    compare_parser.add_argument("file1")
+    compare_parser.add_argument("file2")
+    compare_parser.add_argument("--metrics", help="Comma-separated comparison metrics")
+    compare_parser.add_argument("--sr", type=int, default=16000,
+                                help="Analysis rate (0 keeps native rates)")
+    compare_parser.add_argument("--band", type=float, default=0.1, help="DTW band fraction")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve_command(args)
+        return
+    try:
+        client_command(args)
+    except DaemonError as error:
+        sys.exit(f"Error: {error}")
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No daemon on {args.socket}; start one with `serve`")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import argparse
+import asyncio
+import os
+import re
+
+from aiohttp import web
+
+import telemetry
+from backends import SynthesisError, get_backend
+from chunked_synthesis import synthesize_passage_bytes
+from schemes import available_schemes, transliterate
+from script_id import prepare_text
+from synthesis_cache import cache_key, default_cache
+
+WEBSITE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Website.html")
+
+CONTENT_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+RANGE_HEADER = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class SynthesisService:
+    """Single-flight, queue-bounded synthesis shared by all HTTP requests."""
+
+    def __init__(self, backend_name="gtts", lang="hi", scheme="iast", workers=4,
+                 queue_size=64):
+        self.backend = get_backend(backend_name, lang=lang)
+        self.scheme = scheme
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.in_flight = {}
+        self._tasks = []
+
+    async def start(self, app):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, app):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            key, text, future = await self.queue.get()
+            try:
+                data = await loop.run_in_executor(None, self._synthesize, key, text)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(data)
+            finally:
+                self.in_flight.pop(key, None)
+                self.queue.task_done()
+
+    def _synthesize(self, key, text):
+        cache = default_cache()
+        data = cache.get_bytes(key)
+        if data is None:
+            data = synthesize_passage_bytes(
+                text, self.backend.synthesize, fmt=self.backend.fmt, scheme=self.scheme,
+                **self.backend.cache_fields()
+            )
+            cache.put(key, data, self.backend.fmt)
+        return data
+
+    def key_for(self, text):
+        return cache_key(text, scheme=self.scheme, **self.backend.cache_fields())
+
+    async def audio(self, key, text):
+        """Return audio for text, joining any identical request already running.
+
+        Raises asyncio.QueueFull when the synthesis queue is at capacity.
+        """
+        future = self.in_flight.get(key)
+        if future is None:
+            data = default_cache().get_bytes(key)
+            if data is not None:
+                return data
+            future = asyncio.get_running_loop().create_future()
+            self.queue.put_nowait((key, text, future))
+            self.in_flight[key] = future
+        return await asyncio.shield(future)
+
+
+def audio_response(request, data, etag, content_type):
+    """Serve audio bytes honouring If-None-Match and single byte ranges."""
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers=headers)
+
+    match = RANGE_HEADER.match(request.headers.get("Range", ""))
+    if match and (match.group(1) or match.group(2)):
+        size = len(data)
+        if match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        else:
+            start = max(0, size - int(match.group(2)))
+            end = size - 1
+        if start >= size or start > end:
+            headers["Content-Range"] = f"bytes */{size}"
+            return web.Response(status=416, headers=headers)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return web.Response(
+            status=206, body=data[start:end + 1], content_type=content_type, headers=headers
+        )
+    return web.Response(body=data, content_type=content_type, headers=headers)
+
+
+async def handle_metrics(request):
+    return web.Response(text=telemetry.prometheus_text(),
+                        content_type="text/plain", charset="utf-8",
+                        headers={"Cache-Control": "no-store"})
+
+
+async def handle_index(request):
+    return web.FileResponse(WEBSITE_FILE)
+
+
+async def handle_transliterate(request):
+    service = request.app["service"]
+    text = request.query.get("text", "")
+    scheme = request.query.get("scheme", service.scheme)
+    if scheme not in available_schemes():
+        raise web.HTTPBadRequest(text=f"Unknown scheme {scheme!r}")
+    return web.json_response(
+        {"text": text, "scheme": scheme, "transliteration": transliterate(text, scheme)}
+    )
+
+
+async def handle_tts(request):
+    service = request.app["service"]
+    if request.method == "POST":
+        if request.content_type == "application/json":
+            text = (await request.json()).get("text", "")
+        else:
+            text = (await request.post()).get("text", "")
+    else:
+        text = request.query.get("text", "")
+    if not text.strip():
+        raise web.HTTPBadRequest(text="No text to synthesize")
+
+    english_text = prepare_text(text, service.scheme)
+    key = service.key_for(english_text)
+    etag = f'"{key}"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    try:
+        data = await service.audio(key, english_text)
+    except asyncio.QueueFull:
+        raise web.HTTPServiceUnavailable(
+            text="Synthesis queue is full", headers={"Retry-After": "1"}
+        )
+    except SynthesisError as error:
+        raise web.HTTPBadGateway(text=str(error))
+    content_type = CONTENT_TYPES.get(service.backend.fmt, "application/octet-stream")
+    return audio_response(request, data, etag, content_type)
+
+
+def create_app(**service_options):
+    app = web.Application()
+    service = app["service"] = SynthesisService(**service_options)
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app.router.add_get("/", handle_index)
+    app.router.add_get("/transliterate", handle_transliterate)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/tts", handle_tts)
+    app.router.add_post("/tts", handle_tts)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Sanskrit text-to-speech over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--scheme", default="iast", help="Transliteration scheme")
+    parser.add_argument("--backend", default="gtts", help="Synthesis backend")
+    parser.add_argument("--lang", default="hi", help="Backend language code")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent synthesis calls")
+    parser.add_argument("--queue-size", type=int, default=64, help="Pending synthesis limit")
+    args = parser.parse_args(argv)
+
+    app = create_app(
+        backend_name=args.backend, lang=args.lang, scheme=args.scheme, workers=args.workers,
+        queue_size=args.queue_size,
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()